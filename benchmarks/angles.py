@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Scalar Angle throughput against the previous implementation (no __slots__,
+the previous resolve_angle and grad2rad through the vectorize dispatch on
+every construction, see baseline).
+
+    python -m atsurvey.benchmarks.angles [--number 200000]
+"""
+import argparse
+import time
+from atsurvey.primitives import *
+from atsurvey.benchmarks import baseline
+
+
+class LegacyAngle:
+    def __init__(self, angle):
+        self._angleG = baseline.resolve_angle(angle)
+        self._angleR = baseline.grad2rad(self._angleG)
+
+    @property
+    def value(self):
+        return self._angleG
+
+    @property
+    def sin(self):
+        return round(np.sin(self._angleR), ANGLE_ROUND)
+
+    def __add__(self, other):
+        return LegacyAngle(self.value + instance2val(other))
+
+    def __sub__(self, other):
+        return LegacyAngle(self.value - instance2val(other))
+
+    def __lt__(self, other):
+        return self.value < instance2val(other)
+
+
+def _workloads(cls) -> dict:
+    a, b = cls(123.4567), cls(388.1234)
+
+    return {'construct': lambda: cls(256.789),
+            'add': lambda: a + b,
+            'sub': lambda: a - b,
+            'add float': lambda: a + 310.5,
+            'compare': lambda: a < b,
+            'sin': lambda: cls(12.3456).sin}
+
+
+def _value(func) -> Any:
+    _result = func()
+    return getattr(_result, 'value', _result)
+
+
+def _throughput(func, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return number / (time.perf_counter() - start)
+
+
+def run(number: int):
+    legacy = _workloads(LegacyAngle)
+    current = _workloads(Angle)
+
+    print(f"{'operation':<12}{'before [ops/s]':>18}{'after [ops/s]':>18}"
+          f"{'speedup':>10}")
+    print('-' * 58)
+
+    for name in current:
+        if _value(legacy[name]) != _value(current[name]):
+            raise AssertionError(f"{name} differs from legacy results")
+
+        before = _throughput(legacy[name], number)
+        after = _throughput(current[name], number)
+        print(f"{name:<12}{before:>18,.0f}{after:>18,.0f}"
+              f"{after / before:>9.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=200_000)
+    _args = parser.parse_args()
+
+    run(_args.number)
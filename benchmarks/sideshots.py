@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Sideshot solving across setups on 1 to N threads (SideshotBatch), against
+one Sideshot per setup.
+
+    python -m atsurvey.benchmarks.sideshots [--setups 2000 --shots 500]
+                                            [--workers 1 2 4]
+
+Every worker count is checked for identical results before it is timed.
+"""
+import argparse
+import os
+import time
+from atsurvey.core.sideshot import *
+
+
+def _case(setups: int, shots: int, seed: int = 0) -> Tuple[pd.DataFrame,
+                                                            Container]:
+    rng = np.random.default_rng(seed)
+
+    names = np.array([f'S{i}' for i in range(setups + 1)], dtype=object)
+    stations = Container(PointSet(names,
+                                  rng.uniform(400000, 420000, names.size),
+                                  rng.uniform(4200000, 4220000, names.size),
+                                  rng.uniform(50, 300, names.size)))
+
+    # uneven setups, so that balancing by rows matters
+    counts = rng.integers(1, 2 * shots, setups)
+    _setup = np.repeat(np.arange(setups), counts)
+    _rows = _setup.size
+
+    data = pd.DataFrame(
+        {'bs': names[_setup + 1],
+         'station': names[_setup],
+         'fs': np.array([f'P{i}' for i in range(_rows)], dtype=object),
+         'h_angle': rng.uniform(0, 400, _rows).round(4),
+         'v_angle': rng.uniform(90, 110, _rows).round(4),
+         'slope_dist': rng.uniform(2, 300, _rows).round(3),
+         'station_h': 1.55,
+         'target_h': 1.80})
+
+    return data, stations
+
+
+def _timeit(func, repeat: int) -> float:
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _per_setup(data: pd.DataFrame, stations: Container):
+    for (station, bs), group in data.groupby(['station', 'bs']):
+        Sideshot(group, stations[station], stations[bs]).compute()
+
+
+def _default_workers() -> list:
+    # 1, 2, 4, ... up to the number of CPUs
+    _cpus = os.cpu_count() or 1
+    return sorted({2 ** i for i in range(_cpus.bit_length())} | {_cpus})
+
+
+def run(setups: int, shots: int, workers: list, repeat: int = 3):
+    data, stations = _case(setups, shots)
+    print(f"{len(data)} shots from {setups} setups, {os.cpu_count()} CPUs")
+    print(f"{'workers':<12}{'time [s]':>12}{'speedup':>10}")
+    print('-' * 34)
+
+    expected = SideshotBatch(data, stations).compute()
+
+    t_serial = None
+    for n in workers:
+        result = SideshotBatch(data, stations).compute(n)
+        if not result.equals(expected):
+            raise AssertionError(f"{n} workers differ from one pass")
+
+        _time = _timeit(lambda: SideshotBatch(data, stations).compute(n),
+                        repeat)
+        t_serial = t_serial or _time
+
+        print(f"{n:<12}{_time:>12.4f}{t_serial / _time:>9.2f}x")
+
+    _sample = data.loc[data['station'].isin(data['station'].unique()[:50])]
+    t_loop = _timeit(lambda: _per_setup(_sample, stations), 1)
+    print('-' * 34)
+    print(f"{'per setup':<12}{t_loop * len(data) / len(_sample):>12.4f}"
+          f"  (from {len(_sample)} shots)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--setups', type=int, default=2000)
+    parser.add_argument('--shots', type=int, default=500)
+    parser.add_argument('--workers', nargs='+', type=int,
+                        default=_default_workers())
+    parser.add_argument('--repeat', type=int, default=3)
+    _args = parser.parse_args()
+
+    run(_args.setups, _args.shots, _args.workers, _args.repeat)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+cluster_points (grid hash) against a brute-force union-find over every
+pair of points.
+
+    python -m atsurvey.benchmarks.spatial [--cases 300 --points 2000]
+
+Random small cases, with and without groups and missing coordinates, are
+checked for identical clusters before the large case is timed.
+"""
+import argparse
+import time
+from atsurvey.primitives import *
+
+
+def brute_clusters(x: np.ndarray,
+                   y: np.ndarray,
+                   radius: float,
+                   groups: np.ndarray = None) -> np.ndarray:
+    """
+    Reference clusters: union of every pair within 'radius' and of every
+    pair of the same group, numbered in order of first appearance.
+    """
+
+    _n = x.size
+    parent = list(range(_n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        _i, _j = find(i), find(j)
+        if _i != _j:
+            parent[max(_i, _j)] = min(_i, _j)
+
+    for i in range(_n):
+        for j in range(i + 1, _n):
+            if groups is not None and groups[i] == groups[j]:
+                union(i, j)
+            elif np.hypot(x[i] - x[j], y[i] - y[j]) <= radius:
+                union(i, j)
+
+    _roots = [find(i) for i in range(_n)]
+    _numbers = {}
+    return np.array([_numbers.setdefault(r, len(_numbers)) for r in _roots],
+                    dtype=np.int64)
+
+
+def _case(points: int, rng: np.random.Generator,
+          grouped: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    x = rng.uniform(0, 3, points).round(2)
+    y = rng.uniform(0, 3, points).round(2)
+    x[rng.random(points) < 0.05] = np.nan
+    groups = rng.integers(0, max(points // 2, 1), points) if grouped \
+        else None
+
+    return x, y, groups
+
+
+def check(cases: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+
+    for i in range(cases):
+        x, y, groups = _case(int(rng.integers(1, 40)), rng, i % 2 == 0)
+        radius = float(rng.choice([0.0, 0.3, 1.0]))
+        result = cluster_points(x, y, radius, groups)
+        expected = brute_clusters(x, y, radius, groups)
+        if not np.array_equal(result, expected):
+            raise AssertionError(f"case {i} differs:\n"
+                                 f"x={x.tolist()}\ny={y.tolist()}\n"
+                                 f"groups={groups}, radius={radius}\n"
+                                 f"{result} != {expected}")
+
+    print(f"{cases} random cases identical to brute force")
+
+
+def run(points: int, radius: float, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(400000, 400000 + points ** 0.5, points)
+    y = rng.uniform(4200000, 4200000 + points ** 0.5, points)
+    groups = rng.integers(0, points, points)
+
+    start = time.perf_counter()
+    result = cluster_points(x, y, radius, groups)
+    t_grid = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = brute_clusters(x, y, radius, groups)
+    t_brute = time.perf_counter() - start
+
+    if not np.array_equal(result, expected):
+        raise AssertionError("grid hash differs from brute force")
+
+    print(f"{points} points, radius {radius}")
+    print(f"{'grid hash':<12}{t_grid:>12.4f} s")
+    print(f"{'brute force':<12}{t_brute:>12.4f} s"
+          f"{t_brute / t_grid:>9.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', type=int, default=300)
+    parser.add_argument('--points', type=int, default=2000)
+    parser.add_argument('--radius', type=float, default=0.01)
+    _args = parser.parse_args()
+
+    check(_args.cases)
+    run(_args.points, _args.radius)
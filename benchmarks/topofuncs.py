@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Array kernels of util.topofuncs against the scalar functions they
+replaced, applied per element through np.vectorize (see baseline).
+
+    python -m atsurvey.benchmarks.topofuncs [--sizes 1000 100000 1000000]
+
+Each kernel is checked for identical results to the previous
+implementation before it is timed.
+"""
+import argparse
+import time
+import numpy as np
+from atsurvey.util.topofuncs import *
+from atsurvey.benchmarks import baseline
+
+SIZES = [1_000, 100_000, 1_000_000]
+
+
+def _cases(size: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    angles = rng.uniform(-100, 500, size).round(4)
+    distances = rng.uniform(1, 500, size).round(3)
+    dx = rng.uniform(-500, 500, size)
+    dy = rng.uniform(-500, 500, size)
+
+    return {'resolve_angle': (angles,),
+            'grad2rad': (angles,),
+            'slope2hor': (distances, angles),
+            'hor2ref': (distances, 150.0),
+            'p2p_dh': (distances, angles, 1.55, 1.80),
+            'calc_X': (400000.0, distances, angles),
+            'calc_Y': (4200000.0, distances, angles),
+            'calc_Z': (120.0, distances, angles, 1.55, 1.80),
+            'determine_quartile': (dx, dy),
+            'mean_dh_signed': (dx, np.abs(dy))}
+
+
+def _timeit(func, args, repeat: int) -> float:
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes: list, repeat: int = 3):
+    print(f"{'kernel':<20}{'size':>10}{'vectorize [s]':>16}"
+          f"{'array [s]':>14}{'speedup':>10}")
+    print('-' * 70)
+
+    for size in sizes:
+        for name, args in _cases(size).items():
+            kernel = globals()[name]
+            legacy = getattr(baseline, name)
+
+            expected = legacy(*args).astype(float)
+            result = kernel(*args)
+            if not np.array_equal(expected, result, equal_nan=True):
+                raise AssertionError(f"{name} differs from legacy results")
+
+            t_legacy = _timeit(legacy, args, 1 if size > 100_000 else repeat)
+            t_array = _timeit(kernel, args, repeat)
+
+            print(f"{name:<20}{size:>10}{t_legacy:>16.5f}"
+                  f"{t_array:>14.5f}{t_legacy / t_array:>9.1f}x")
+        print('-' * 70)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    _args = parser.parse_args()
+
+    run(_args.sizes, _args.repeat)
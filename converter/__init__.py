@@ -1,3 +1,3 @@
 # -*- coding: utf-8 -*-
-from atsurvey.converter.formater import TraverseFormatter
+from atsurvey.converter.formater import TraverseFormatter, MeasurementTable
 from atsurvey.converter.nikon import NikonRawConverter
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from atsurvey.primitives import *
+from typing import List, Tuple
 
 
 class TraverseFormatter:
@@ -17,37 +18,98 @@ class TraverseFormatter:
     def join_stops_for_dist(station, fs) -> str:
         return '-'.join(sorted([station, fs]))
 
+    @staticmethod
+    def angle_keys(bs: pd.Series,
+                   station: pd.Series,
+                   fs: pd.Series) -> pd.Series:
+        return bs.astype(str).str.cat([station.astype(str),
+                                       fs.astype(str)], sep='-')
+
+    @staticmethod
+    def pair_keys(station: pd.Series,
+                  fs: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Order-independent 'a-b' key of each (station, fs) pair.
+
+        Stop names are factorized in sorted order, so the smaller code of a
+        pair is also its first name and the key needs no per-row sort.
+        Strings are only built once per distinct pair.
+
+        :return: Tuple[np.ndarray, np.ndarray]
+            Integer group of each row and its string key.
+        """
+
+        _station = station.astype(str).values
+        _fs = fs.astype(str).values
+        _n = _station.size
+
+        codes, names = pd.factorize(np.concatenate([_station, _fs]),
+                                    sort=True)
+        _first = np.minimum(codes[:_n], codes[_n:])
+        _second = np.maximum(codes[:_n], codes[_n:])
+
+        pairs, unique_pairs = pd.factorize(_first * len(names) + _second)
+        _names = pd.Series(names, dtype=object)
+        _keys = _names[unique_pairs // len(names)].str.cat(
+            _names[unique_pairs % len(names)].values, sep='-')
+
+        return pairs, _keys.values[pairs]
+
     def get_data(self) -> pd.DataFrame:
         return self._traverse.copy()
 
     def tranform(self):
+        return self.reduce().aggregate()
+
+    def reduce(self):
+        """
+        Per-row part of the formatting: distance reductions and the angle
+        and distance keys. Rows are independent of each other here.
+        """
+
+        # rows without a distance (angle only) reduce to NaN
+        _numeric = self.df[['slope_dist', 'v_angle',
+                            'station_h', 'target_h']].apply(pd.to_numeric,
+                                                             errors='coerce')
+
         self.df.fillna('<NA>', inplace=True)
 
-        s_dist = SlopeDistances(self.df['slope_dist'])
-        h_dist = s_dist.to_horizontal(self.df['v_angle'])
-        dz_temp = s_dist.to_delta(self.df['v_angle'],
-                                  self.df['station_h'],
-                                  self.df['target_h'])
+        s_dist = SlopeDistances(_numeric['slope_dist'])
+        h_dist = s_dist.to_horizontal(_numeric['v_angle'])
+        dz_temp = s_dist.to_delta(_numeric['v_angle'],
+                                  _numeric['station_h'],
+                                  _numeric['target_h'])
 
-        self.df['angle'] = self.df.apply(
-            lambda x: self.join_stops_for_angle(x.bs, x.station, x.fs),
-            axis=1)
+        self.df['angle'] = self.angle_keys(self.df['bs'],
+                                           self.df['station'],
+                                           self.df['fs'])
 
-        self.df['dist'] = self.df.apply(
-            lambda x: self.join_stops_for_dist(x.station, x.fs),
-            axis=1)
+        self._pairs, self.df['dist'] = self.pair_keys(self.df['station'],
+                                                      self.df['fs'])
 
         self.angles = self.df['angle'].values
         self.dists = self.df['dist'].values
 
         self.df['stop_dist'] = h_dist.values
-        miki = self.df.groupby('dist')['stop_dist'].mean()
-        self.df['h_dist'] = self.df['dist'].map(miki)
-
         self.df['stop_dh'] = dz_temp.values
+
+        return self
+
+    def aggregate(self):
+        """
+        Averages distances and |dh| of each station pair over the rows of
+        this formatter and selects the traverse rows.
+        """
+
+        means = pd.DataFrame({'stop_dist': self.df['stop_dist'].values,
+                              'abs_dh': abs(self.df['stop_dh'].values)},
+                             index=self.df.index).groupby(
+            self._pairs).transform('mean')
+
+        self.df.insert(self.df.columns.get_loc('stop_dist') + 1,
+                       'h_dist', means['stop_dist'])
         self.df['abs_dh'] = abs(self.df['stop_dh'])
-        dz = self.df.groupby('dist')['abs_dh'].mean()
-        self.df['abs_avg_dh'] = self.df['dist'].map(dz)
+        self.df['abs_avg_dh'] = means['abs_dh']
         self.df['dz_temp'] = mean_dh_signed(self.df['stop_dh'],
                                             self.df['abs_avg_dh'])
 
@@ -56,3 +118,121 @@ class TraverseFormatter:
                                       'h_angle', 'h_dist', 'dz_temp', ]]
 
         return self
+
+    @classmethod
+    def from_reduced(cls, data: pd.DataFrame, pairs: np.ndarray):
+        """
+        Formatter over rows that already went through reduce(), e.g. a
+        slice of a MeasurementTable. Only aggregate() is left to run.
+        """
+
+        formatter = cls.__new__(cls)
+        formatter.df = data
+        formatter._pairs = pairs
+        formatter.angles = data['angle'].values
+        formatter.dists = data['dist'].values
+        formatter._traverse = None
+
+        return formatter
+
+    @classmethod
+    def from_aggregated(cls, traverse: pd.DataFrame):
+        """
+        Formatter over traverse rows that already went through aggregate(),
+        e.g. in a worker process. Only get_data() is left to call.
+        """
+
+        formatter = cls.__new__(cls)
+        formatter.df = traverse
+        formatter._pairs = None
+        formatter.angles = None
+        formatter.dists = None
+        formatter._traverse = traverse
+
+        return formatter
+
+
+class MeasurementTable:
+    """
+    Measurement table of a whole project, reduced and keyed once.
+
+    The per-row reductions (slope to horizontal distance, height
+    differences) and the angle/distance keys are computed for all rows
+    up front. Rows are indexed by (station, fs), so the rows of a traverse
+    are found with one binary search per pair of its stops instead of
+    masks over the whole table.
+    """
+
+    def __init__(self, data: Any):
+        self.formatter = TraverseFormatter(data).reduce()
+        self.df = self.formatter.df
+        self.pairs = self.formatter._pairs
+        # column arrays, slicing them is much cheaper than slicing the frame
+        self._columns = {c: self.df[c].values for c in self.df.columns}
+        self.angles = set(self.df['angle'].tolist())
+        self.dists = set(self.df.loc[np.isfinite(
+            self.df['stop_dist'].values.astype(float)), 'dist'].tolist())
+
+        # point names of bs, station and fs share one set of codes
+        _n = self.df.shape[0]
+        _codes, self.names = pd.factorize(np.concatenate(
+            [self._columns['bs'],
+             self._columns['station'],
+             self._columns['fs']]))
+        self._codes = dict(zip(self.names.tolist(), range(self.names.size)))
+        self.codes = {'bs': _codes[:_n],
+                      'station': _codes[_n:2 * _n],
+                      'fs': _codes[2 * _n:]}
+
+        # rows sorted by (station, fs) codes, the rows of one setup and
+        # target are a contiguous range of the sorted keys
+        _keys = self.codes['station'].astype(np.int64) * self.names.size + \
+            self.codes['fs']
+        self._order = np.argsort(_keys, kind='stable')
+        self._keys = _keys[self._order]
+
+    def __len__(self) -> int:
+        return self.df.shape[0]
+
+    def rows(self, stops: list) -> np.ndarray:
+        """
+        Positions of the rows whose bs, station and fs are all in stops,
+        in table order.
+        """
+
+        _codes = np.array([self._codes[s] for s in set(stops)
+                           if s in self._codes], dtype=np.int64)
+
+        _queries = (_codes[:, None] * len(self._codes) + _codes).ravel()
+        _lo = np.searchsorted(self._keys, _queries, side='left')
+        _counts = np.searchsorted(self._keys, _queries, side='right') - _lo
+
+        if not _counts.sum():
+            return np.empty(0, dtype=np.int64)
+
+        _starts = np.repeat(_lo - np.cumsum(_counts) + _counts, _counts)
+        _rows = np.sort(self._order[_starts + np.arange(_counts.sum())])
+
+        return _rows[np.isin(self.codes['bs'][_rows], _codes)]
+
+    def _take(self, rows: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame({c: v[rows] for c, v in self._columns.items()},
+                            index=self.df.index[rows]).infer_objects()
+
+    def pick(self, stops: list) -> pd.DataFrame:
+        return self._take(self.rows(stops))
+
+    def format(self, stops: list) -> TraverseFormatter:
+        _rows = self.rows(stops)
+
+        return TraverseFormatter.from_reduced(self._take(_rows),
+                                              self.pairs[_rows]).aggregate()
+
+    def missing_angles(self, stops: list) -> List[str]:
+        return [angle for angle in fmt_angle(stops)
+                if angle not in self.angles]
+
+    def missing_dists(self, stops: list) -> List[str]:
+        # the leg after the last angle is never used
+        return [dist for dist in fmt_dist(stops[:-1])
+                if '-'.join(sorted(dist.split('-'))) not in self.dists]
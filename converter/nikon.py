@@ -1,19 +1,70 @@
 # -*- coding: utf-8 -*-
+import csv
+import re
 import numpy as np
-from typing import Union
+from array import array
+from typing import List, Union
 from atsurvey.util.io import *
 from atsurvey.util.paths import *
 
+# records kept from the raw file, the rest are skipped while reading
+RAW_RECORDS = {'OB', 'SS', 'LS', '--Target Generic Prism: "My Prism"',
+               '--Target Reflectorless: "My Reflectorless"'}
+RAW_FIELDS = 7
+
+_STATION = re.compile('OP([a-zA-Z]+[0-9]+)')
+_FS = re.compile('FP([a-zA-Z0-9]+)')
+_H_ANGLE = re.compile(r'AR(\d+\.\d+)')
+_V_ANGLE = re.compile(r'ZE(\d+\.\d+)')
+_SLOPE_DIST = re.compile(r'SD(\d+\.\d+)')
+_TARGET_H = re.compile(r'HR:(\d+\.\d+)')
+_STATION_H = re.compile(r'HI(\d+\.\d+)')
+
+# the usual OB/SS line, read with one match: no heights, no quotes
+_MEASUREMENT = re.compile(r'(OB|SS),OP([a-zA-Z]+[0-9]+),FP([a-zA-Z0-9]+),'
+                          r'AR(\d+\.\d+),ZE(\d+\.\d+),SD(\d+\.\d+)'
+                          r'(?:,[^,"\r\n]*)?\r?\n?\Z')
+
+
+def _search(pattern: re.Pattern, field: str) -> Union[str, None]:
+    _match = pattern.search(field)
+    return _match.group(1) if _match else None
+
+
+def _value(pattern: re.Pattern, field: str) -> float:
+    _match = pattern.search(field)
+    return float(_match.group(1)) if _match else np.nan
+
+
+def iter_raw_lines(file: Union[str, Path]):
+    """
+    Streams the lines of a raw file, without the header line.
+    """
+
+    with open(file, 'r', newline='', encoding='utf-8') as raw:
+        next(raw, None)
+        yield from raw
+
+
+def split_raw_line(line: str) -> List[str]:
+    """
+    Comma separated fields of a raw line, padded or cut to RAW_FIELDS,
+    empty for a blank line.
+    """
+
+    fields = next(csv.reader([line]), [])
+    if not fields:
+        return fields
+
+    return (fields + [''] * RAW_FIELDS)[:RAW_FIELDS]
+
 
 class NikonRawConverter:
     def __init__(self, file: Union[str, Path]):
         self.filepath = Path(file)
         self.wd = ATTPaths(self.filepath.parent)
         self.name = self.filepath.stem
-        self.raw = load_data(self.filepath,
-                             skiprows=1,
-                             names=range(7),
-                             header=None)
+        self._raw = None
 
         self.processed = pd.DataFrame()
         self.stations = pd.DataFrame()
@@ -21,57 +72,105 @@ class NikonRawConverter:
         self.all = pd.DataFrame()
         self.convert_map = dict()
 
-    @staticmethod
-    def meas_type(fs: str, h_angle: float) -> str:
-        if fs[0].isalpha() and h_angle == 0.0:
-            return 'backsight'
-        elif fs[0].isalpha():
-            return 'station'
-        else:
-            return 'sideshot'
+    @property
+    def raw(self) -> pd.DataFrame:
+        # the whole file as text columns, only loaded when asked for
+        if self._raw is None:
+            self._raw = load_data(self.filepath,
+                                  skiprows=1,
+                                  names=range(RAW_FIELDS),
+                                  header=None)
+
+        return self._raw
+
+    def tokenize(self) -> pd.DataFrame:
+        """
+        Reads the raw file once, line by line, into typed columns.
+
+        The usual OB/SS lines are read with a single match, any other line
+        is split once and its fields searched, and the values are parsed
+        straight into column buffers. Records span one line. The backsight
+        and the instrument and target heights are carried forward while
+        reading, so records without a station are dropped right away and
+        memory only grows with the measurements kept.
+
+        :return: pd.DataFrame
+            One row per measurement with a station.
+        """
+
+        columns = {'bs': [], 'station': [], 'fs': []}
+        values = {c: array('d') for c in ('h_angle', 'v_angle', 'slope_dist',
+                                          'target_h', 'station_h')}
+
+        bs = np.nan
+        target_h = np.nan
+        station_h = np.nan
+
+        _bs, _station, _fs = columns['bs'], columns['station'], columns['fs']
+        _h_angle, _v_angle, _slope_dist, _target_h, _station_h = \
+            values.values()
+
+        for line in iter_raw_lines(self.filepath):
+            _match = _MEASUREMENT.match(line)
+            if _match is not None:
+                record, station, fs, h_angle, v_angle, slope_dist = \
+                    _match.groups()
+                h_angle = float(h_angle)
+                v_angle = float(v_angle)
+                slope_dist = float(slope_dist)
+            else:
+                fields = split_raw_line(line)
+                if not fields or fields[0] not in RAW_RECORDS:
+                    continue
+
+                record, _info = fields[0], fields[1]
+                station = _search(_STATION, _info)
+                fs = _search(_FS, fields[2])
+                h_angle = _value(_H_ANGLE, fields[3])
+                v_angle = _value(_V_ANGLE, fields[4])
+                slope_dist = _value(_SLOPE_DIST, fields[5])
+
+                # heights are rare, skip the searches on most records
+                if 'H' in _info:
+                    _height = _value(_TARGET_H, _info)
+                    if _height == _height and _height != 0:
+                        target_h = _height
+                    _height = _value(_STATION_H, _info)
+                    if _height == _height and _height != 0:
+                        station_h = _height
+
+            if record == 'OB' and h_angle == 0 and fs is not None:
+                bs = fs
+
+            if station is None:
+                continue
+
+            _bs.append(bs)
+            _station.append(station)
+            _fs.append(fs if fs is not None else np.nan)
+            _h_angle.append(h_angle)
+            _v_angle.append(v_angle)
+            _slope_dist.append(slope_dist)
+            _target_h.append(target_h)
+            _station_h.append(station_h)
+
+        _data = {c: np.array(v, dtype=object) for c, v in columns.items()}
+        _data.update({c: np.array(v, dtype=float)
+                      for c, v in values.items()})
+
+        return pd.DataFrame(_data,
+                            columns=['bs', 'station', 'fs', 'h_angle',
+                                     'v_angle', 'slope_dist', 'target_h',
+                                     'station_h'])
 
     def transform(self):
-        to_keep = ['OB', 'SS', 'LS', '--Target Generic Prism: "My Prism"',
-                   '--Target Reflectorless: "My Reflectorless"']
-
-        df = self.raw[self.raw[0].isin(to_keep)]
-
-        df['midenismos'] = ''
-        df['stasi'] = df[1].str.extract('OP([a-zA-Z]+[0-9]+)')[0]
-        df['metrisi'] = df[2].str.extract('FP([a-zA-Z0-9]+)')[0]
-        df['orizontia'] = df[3].str.extract(r'AR(\d+\.\d+)')[0].astype(float)
-        df['katakorifi'] = df[4].str.extract(r'ZE(\d+\.\d+)')[0].astype(float)
-        df['apostasi'] = df[5].str.extract(r'SD(\d+\.\d+)')[0].astype(float)
-        df['us'] = df[1].str.extract(r'HR:(\d+\.\d+)')[0].astype(float)
-        df['uo'] = df[1].str.extract(r'HI(\d+\.\d+)')[0].astype(float)
-        df.loc[(df[0] == 'OB') & (df['orizontia'] == 0), 'midenismos'] = df.loc[
-            (df[0] == 'OB') & (df['orizontia'] == 0), 'metrisi']
-
-        df2 = df[
-            [0, 'midenismos', 'stasi', 'metrisi', 'orizontia', 'katakorifi',
-             'apostasi', 'us', 'uo']]
-
-        df2.columns = ['meas_type', 'bs', 'station', 'fs', 'h_angle', 'v_angle',
-                       'slope_dist', 'target_h', 'station_h']
-
-        df2['bs'].replace('', np.nan, inplace=True)
-        df2['bs'].fillna(method='ffill', inplace=True)
+        self.processed = self.tokenize()
 
-        df2['station_h'].replace(0, np.nan, inplace=True)
-        df2['target_h'].replace(0, np.nan, inplace=True)
-
-        df2['station_h'].fillna(method='ffill', inplace=True)
-        df2['target_h'].fillna(method='ffill', inplace=True)
-
-        df2['station'].fillna('<NA>', inplace=True)
-
-        self.processed = df2.loc[
-            df2['station'].str.contains('^[a-zA-Z]+[0-9]+', regex=True)].copy()
-
-        self.processed.reset_index(inplace=True, drop=True)
-
-        self.processed['meas_type'] = self.processed.apply(
-            lambda x: self.meas_type(x['fs'], x['h_angle']), axis=1)
+        _alpha = self.processed['fs'].str[:1].str.isalpha().fillna(
+            False).values.astype(bool)
+        self.processed['meas_type'] = np.where(
+            _alpha & (self.processed['h_angle'].values == 0.0), 'backsight',
+            np.where(_alpha, 'station', 'sideshot'))
 
         self.processed.loc[
             self.processed['meas_type'] == 'midenismos', 'bs'] = '-'
@@ -87,21 +186,15 @@ class NikonRawConverter:
                                                 'station': pd.StringDtype(),
                                                 'fs': pd.StringDtype()})
 
-        indexes_to_delete = []
-
+        # repeated backsight observations, right after each other
         search = self.processed.loc[
-            self.processed['meas_type'] == 'backsight'].copy()
-
-        search.reset_index(inplace=True)
-
-        for i in search.itertuples():
-            try:
-                if i.station == search.loc[i.Index + 1, 'station'] and i.fs == \
-                        search.loc[i.Index + 1, 'fs']:
-                    if i.index + 1 == search.loc[i.Index + 1, 'index']:
-                        indexes_to_delete.append(i.index)
-            except KeyError:
-                pass
+            self.processed['meas_type'] == 'backsight']
+        _index = search.index.values
+        _station = search['station'].values.astype(object)
+        _fs = search['fs'].values.astype(object)
+        _repeated = (_station[:-1] == _station[1:]) & \
+                    (_fs[:-1] == _fs[1:]) & (np.diff(_index) == 1)
+        indexes_to_delete = _index[:-1][_repeated]
 
         self.all = self.processed.drop(indexes_to_delete)
 
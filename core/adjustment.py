@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+from atsurvey.core.traverse import *
+
+RESIDUAL_COLUMNS = ['obs_type', 'bs', 'station', 'fs',
+                    'observed', 'adjusted', 'residual', 'sigma']
+
+
+def conjugate_gradient(matvec: Any,
+                       b: np.ndarray,
+                       diagonal: np.ndarray,
+                       tol: float = 1e-12,
+                       maxiter: int = None) -> Tuple[np.ndarray, int]:
+    """
+    Jacobi-preconditioned conjugate gradient for N x = b, with N symmetric
+    positive (semi-)definite and only known through its products.
+
+    Unknowns with a zero diagonal (no observations) stay at zero.
+
+    :param matvec: Any
+        Function returning N @ x.
+    :param b: np.ndarray
+        Right hand side.
+    :param diagonal: np.ndarray
+        Diagonal of N (preconditioner).
+    :param tol: float
+        Stop when |r| <= tol * |b|.
+    :param maxiter: int
+        Iteration limit, 10 * len(b) if None.
+    :return: Tuple[np.ndarray, int]
+        Solution and number of iterations.
+    """
+
+    x = np.zeros_like(b)
+    _stop = tol * np.linalg.norm(b)
+    if _stop == 0:
+        return x, 0
+
+    with np.errstate(divide='ignore'):
+        _inverse = np.where(diagonal > 0, 1 / diagonal, 0.0)
+
+    r = b * (_inverse > 0)
+    z = r * _inverse
+    p = z.copy()
+    rz = r @ z
+
+    i = 0
+    for i in range(1, (maxiter or 10 * b.size) + 1):
+        Np = matvec(p)
+        alpha = rz / (p @ Np)
+        x += alpha * p
+        r -= alpha * Np
+        if np.linalg.norm(r) <= _stop:
+            break
+        z = r * _inverse
+        _rz = r @ z
+        p = z + (_rz / rz) * p
+        rz = _rz
+
+    return x, i
+
+
+class _SparseSystem:
+    """
+    Weighted observation equations A x = l with A in coordinate form.
+
+    The normal matrix AᵀPA is never formed: its products and diagonal are
+    accumulated from the non-zero entries of A, so memory follows the
+    number of observations and not the square of the unknowns.
+    """
+
+    def __init__(self,
+                 rows: np.ndarray,
+                 cols: np.ndarray,
+                 values: np.ndarray,
+                 misclosures: np.ndarray,
+                 weights: np.ndarray,
+                 unknowns: int):
+        _keep = cols >= 0
+        self.rows = rows[_keep]
+        self.cols = cols[_keep]
+        self.values = values[_keep]
+        self.l = misclosures
+        self.p = weights
+        self.n = unknowns
+
+    def _a(self, x: np.ndarray) -> np.ndarray:
+        return np.bincount(self.rows, self.values * x[self.cols],
+                           minlength=self.l.size)
+
+    def _at(self, y: np.ndarray) -> np.ndarray:
+        return np.bincount(self.cols, self.values * y[self.rows],
+                           minlength=self.n)
+
+    def normal(self, x: np.ndarray) -> np.ndarray:
+        return self._at(self.p * self._a(x))
+
+    @property
+    def diagonal(self) -> np.ndarray:
+        return np.bincount(self.cols, self.values ** 2 * self.p[self.rows],
+                           minlength=self.n)
+
+    def solve(self, tol: float = 1e-12) -> Tuple[np.ndarray, int]:
+        return conjugate_gradient(self.normal, self._at(self.p * self.l),
+                                  self.diagonal, tol=tol)
+
+
+class NetworkAdjustment:
+    """
+    Least-squares adjustment of a whole control network from the
+    measurement table.
+
+    Horizontal angles and horizontal distances adjust X and Y (Gauss-Newton
+    iterations), height differences adjust Z (one linear solve). Every
+    measurement row between two network points is one observation, so
+    repeated rounds add redundancy. Distances are reduced to the grid with
+    the mean elevation and scale factor of their ends, as in the traverses.
+
+    :param measurements: MeasurementTable
+        Measurements of the project.
+    :param points: Container
+        Approximate coordinates of every network point (e.g. the project
+        stations after compute_traverses()).
+    :param fixed: Any
+        Names of the points that keep their coordinates.
+    :param angle_sigma: float
+        Standard deviation of a horizontal angle in grads.
+    :param dist_sigma: float
+        Constant part of the standard deviation of a distance in meters.
+    :param dist_ppm: float
+        Distance dependent part of the standard deviation of a distance.
+    :param dh_sigma: float
+        Standard deviation of a height difference in meters.
+    """
+
+    def __init__(self,
+                 measurements: MeasurementTable,
+                 points: Container,
+                 fixed: Any,
+                 angle_sigma: float = 0.0010,
+                 dist_sigma: float = 0.003,
+                 dist_ppm: float = 2.0,
+                 dh_sigma: float = 0.005):
+        self.measurements = measurements
+        self.angle_sigma = angle_sigma
+        self.dist_sigma = dist_sigma
+        self.dist_ppm = dist_ppm
+        self.dh_sigma = dh_sigma
+
+        _points = points.pointset
+        self.names = _points.names
+        self.x = _points.x.copy()
+        self.y = _points.y.copy()
+        self.z = _points.z.copy()
+
+        _fixed = set(fixed)
+        self.free = np.array([n not in _fixed for n in self.names.tolist()],
+                             dtype=bool)
+        self._unknown = np.where(self.free, np.cumsum(self.free) - 1, -1)
+
+        self.points = None
+        self.residuals = None
+        self.sigma0 = {'horizontal': np.nan, 'vertical': np.nan}
+        self.iterations = 0
+
+        self._observations()
+
+    def _observations(self):
+        _table = self.measurements
+        _lookup = pd.Index(self.names).get_indexer(_table.names)
+        _lookup = np.append(_lookup, -1)
+
+        # table name codes -> network point positions (-1 outside)
+        bs = _lookup[_table.codes['bs']]
+        station = _lookup[_table.codes['station']]
+        fs = _lookup[_table.codes['fs']]
+
+        h_angle = pd.to_numeric(pd.Series(_table._columns['h_angle']),
+                                errors='coerce').values
+        h_dist = pd.to_numeric(pd.Series(_table._columns['stop_dist']),
+                               errors='coerce').values
+        dh = pd.to_numeric(pd.Series(_table._columns['stop_dh']),
+                           errors='coerce').values
+
+        _pair = (station >= 0) & (fs >= 0) & (station != fs)
+
+        _angles = np.flatnonzero(_pair & (bs >= 0) & (bs != station) &
+                                 np.isfinite(h_angle) & (h_angle != 0))
+        _dists = np.flatnonzero(_pair & np.isfinite(h_dist) & (h_dist > 0))
+        _dhs = np.flatnonzero(_pair & np.isfinite(dh))
+
+        self._angles = {'rows': _angles,
+                        'bs': bs[_angles],
+                        'station': station[_angles],
+                        'fs': fs[_angles],
+                        'observed': h_angle[_angles]}
+
+        _s, _f = station[_dists], fs[_dists]
+        _elevation = (self.z[_s] + self.z[_f]) / 2
+        _k = calc_k(self.x[_s], self.x[_f])
+        _grid = h_dist[_dists] * (EARTH_C / (EARTH_C + _elevation)) * _k
+        self._dists = {'rows': _dists,
+                       'station': _s,
+                       'fs': _f,
+                       'observed': _grid}
+
+        self._dhs = {'rows': _dhs,
+                     'station': station[_dhs],
+                     'fs': fs[_dhs],
+                     'observed': dh[_dhs]}
+
+    def _horizontal_system(self) -> Tuple[_SparseSystem, np.ndarray,
+                                          np.ndarray]:
+        x, y = self.x, self.y
+        _a, _d = self._angles, self._dists
+        n_a, n_d = _a['observed'].size, _d['observed'].size
+
+        # angles (radians): direction to fs minus direction to bs
+        dxf = x[_a['fs']] - x[_a['station']]
+        dyf = y[_a['fs']] - y[_a['station']]
+        dxb = x[_a['bs']] - x[_a['station']]
+        dyb = y[_a['bs']] - y[_a['station']]
+        d2f = dxf ** 2 + dyf ** 2
+        d2b = dxb ** 2 + dyb ** 2
+
+        a_computed = np.arctan2(dxf, dyf) - np.arctan2(dxb, dyb)
+        a_misclosure = (_a['observed'] * np.pi / 200 - a_computed + np.pi) \
+            % (2 * np.pi) - np.pi
+        a_sigma = np.full(n_a, self.angle_sigma * np.pi / 200)
+
+        a_points = [_a['fs'], _a['fs'],
+                    _a['bs'], _a['bs'],
+                    _a['station'], _a['station']]
+        a_axes = [0, 1, 0, 1, 0, 1]
+        a_values = [dyf / d2f, -dxf / d2f,
+                    -dyb / d2b, dxb / d2b,
+                    -dyf / d2f + dyb / d2b, dxf / d2f - dxb / d2b]
+
+        # distances (meters)
+        dx = x[_d['fs']] - x[_d['station']]
+        dy = y[_d['fs']] - y[_d['station']]
+        d_computed = np.sqrt(dx ** 2 + dy ** 2)
+        d_misclosure = _d['observed'] - d_computed
+        d_sigma = self.dist_sigma + self.dist_ppm * 1e-6 * _d['observed']
+
+        d_points = [_d['fs'], _d['fs'], _d['station'], _d['station']]
+        d_axes = [0, 1, 0, 1]
+        d_values = [dx / d_computed, dy / d_computed,
+                    -dx / d_computed, -dy / d_computed]
+
+        _a_rows = np.arange(n_a)
+        _d_rows = np.arange(n_a, n_a + n_d)
+
+        rows = np.concatenate([_a_rows] * 6 + [_d_rows] * 4)
+        points = np.concatenate(a_points + d_points)
+        axes = np.repeat(a_axes + d_axes, [n_a] * 6 + [n_d] * 4)
+        values = np.concatenate(a_values + d_values)
+
+        _unknown = self._unknown[points]
+        cols = np.where(_unknown >= 0, 2 * _unknown + axes, -1)
+
+        misclosures = np.concatenate([a_misclosure, d_misclosure])
+        sigma = np.concatenate([a_sigma, d_sigma])
+
+        system = _SparseSystem(rows, cols, values, misclosures, 1 / sigma ** 2,
+                               2 * int(self.free.sum()))
+
+        return system, np.concatenate([a_computed, d_computed]), sigma
+
+    def _vertical_system(self) -> Tuple[_SparseSystem, np.ndarray]:
+        _h = self._dhs
+        n_h = _h['observed'].size
+        _rows = np.arange(n_h)
+
+        computed = self.z[_h['fs']] - self.z[_h['station']]
+        sigma = np.full(n_h, float(self.dh_sigma))
+
+        system = _SparseSystem(np.concatenate([_rows, _rows]),
+                               self._unknown[np.concatenate([_h['fs'],
+                                                             _h['station']])],
+                               np.concatenate([np.ones(n_h), -np.ones(n_h)]),
+                               _h['observed'] - computed,
+                               1 / sigma ** 2,
+                               int(self.free.sum()))
+
+        return system, sigma
+
+    @staticmethod
+    def _sigma0(system: _SparseSystem, residuals: np.ndarray) -> float:
+        _redundancy = residuals.size - int((system.diagonal > 0).sum())
+        if _redundancy <= 0:
+            return np.nan
+
+        return float(np.sqrt((system.p * residuals ** 2).sum() /
+                             _redundancy))
+
+    def adjust(self,
+               max_iter: int = 10,
+               tolerance: float = 1e-5) -> Tuple[Container, pd.DataFrame]:
+        """
+        :param max_iter: int
+            Maximum Gauss-Newton iterations of the horizontal adjustment.
+        :param tolerance: float
+            Stop iterating when no coordinate moves more than this (m).
+        :return: Tuple[Container, pd.DataFrame]
+            Adjusted points and the residual of every observation.
+        """
+
+        _free = np.flatnonzero(self.free)
+
+        for self.iterations in range(1, max_iter + 1):
+            system, _, _ = self._horizontal_system()
+            if not system.l.size:
+                break
+            delta, _ = system.solve()
+            self.x[_free] += delta[0::2]
+            self.y[_free] += delta[1::2]
+            if np.abs(delta).max(initial=0) < tolerance:
+                break
+
+        h_system, h_computed, h_sigma = self._horizontal_system()
+        # residuals = adjusted - observed
+        h_residuals = -h_system.l
+        self.sigma0['horizontal'] = self._sigma0(h_system, h_residuals)
+
+        v_system, v_sigma = self._vertical_system()
+        if v_system.l.size:
+            delta, _ = v_system.solve()
+            self.z[_free] += delta
+        v_system, v_sigma = self._vertical_system()
+        v_residuals = -v_system.l
+        self.sigma0['vertical'] = self._sigma0(v_system, v_residuals)
+
+        self.points = Container(PointSet(self.names, self.x, self.y, self.z))
+        self.residuals = self._residuals(h_computed, h_residuals, h_sigma,
+                                         v_residuals, v_sigma)
+
+        return self.points, self.residuals
+
+    def _residuals(self,
+                   h_computed: np.ndarray,
+                   h_residuals: np.ndarray,
+                   h_sigma: np.ndarray,
+                   v_residuals: np.ndarray,
+                   v_sigma: np.ndarray) -> pd.DataFrame:
+        _a, _d, _h = self._angles, self._dists, self._dhs
+        n_a = _a['observed'].size
+
+        def _names(values):
+            return self.names[values]
+
+        a_residuals = h_residuals[:n_a] * 200 / np.pi
+        frames = [
+            pd.DataFrame({'obs_type': 'angle',
+                          'bs': _names(_a['bs']),
+                          'station': _names(_a['station']),
+                          'fs': _names(_a['fs']),
+                          'observed': _a['observed'],
+                          'adjusted': resolve_angle(_a['observed'] +
+                                                    a_residuals),
+                          'residual': a_residuals,
+                          'sigma': h_sigma[:n_a] * 200 / np.pi},
+                         index=self.measurements.df.index[_a['rows']]),
+            pd.DataFrame({'obs_type': 'dist',
+                          'bs': None,
+                          'station': _names(_d['station']),
+                          'fs': _names(_d['fs']),
+                          'observed': _d['observed'],
+                          'adjusted': h_computed[n_a:],
+                          'residual': h_residuals[n_a:],
+                          'sigma': h_sigma[n_a:]},
+                         index=self.measurements.df.index[_d['rows']]),
+            pd.DataFrame({'obs_type': 'dh',
+                          'bs': None,
+                          'station': _names(_h['station']),
+                          'fs': _names(_h['fs']),
+                          'observed': _h['observed'],
+                          'adjusted': _h['observed'] + v_residuals,
+                          'residual': v_residuals,
+                          'sigma': v_sigma},
+                         index=self.measurements.df.index[_h['rows']])]
+
+        return pd.concat(frames)[RESIDUAL_COLUMNS]
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+from atsurvey.core.traverse import *
+
+BATCH_COLUMNS = ['traverse', 'mid', 'bs', 'station', 'fs',
+                 'h_dist', 'surf_dist', 'egsa_dist',
+                 'h_angle', 'h_angle_fixed', 'azimuth',
+                 'dX', 'dY', 'dZ', 'X', 'Y', 'Z']
+
+METRICS_COLUMNS = ['traverse', 'stations', 'length', 'mean_elev',
+                   'angular', 'horizontal', 'wx', 'wy', 'wz']
+
+
+def _segment_nansum(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    # np.nansum per segment (pairwise summation), so that every sum is
+    # bit-identical to the Distances/Angles sums of earlier releases.
+    # np.add.reduceat can't replace it: it adds each segment from left to
+    # right, which differs in the last bits for segments of more than 8
+    # values. One call per traverse is cheap next to building its frames.
+    return np.array([np.nansum(values[i:j])
+                     for i, j in zip(offsets[:-1], offsets[1:])])
+
+
+def _scale(values: np.ndarray,
+           factors: np.ndarray,
+           exact: np.ndarray) -> np.ndarray:
+    # same rounding as _op_scale: builtin round for python float factors,
+    # np.round for numpy scalars
+    _scaled = values * factors
+    _rounded = round_fast(_scaled, DIST_ROUND)
+    if exact.any():
+        _rounded[exact] = round_exact(_scaled[exact], DIST_ROUND)
+
+    return _rounded
+
+
+class TraverseBatch:
+    """
+    Solves many traverses at once.
+
+    The rows of all traverses are stacked in flat arrays with segment
+    offsets, and the distance reductions, angular correction, azimuth
+    propagation, coordinate correction and misclosures of all of them are
+    computed in vectorized passes. Traverse.compute() solves a batch of
+    one, so this is the only implementation of the computation.
+    """
+
+    def __init__(self, traverses: List[Traverse]):
+        self.traverses = [t for t in traverses if t.is_validated]
+        self.offsets = np.cumsum(
+            [0] + [t.traverse.shape[0] for t in self.traverses])
+        self.results = None
+        self.metrics = None
+
+    def __len__(self) -> int:
+        return len(self.traverses)
+
+    def _scalars(self) -> dict:
+        _scalars = {'elevation': [], 'elevation_exact': [],
+                    'k': [], 'k_exact': [],
+                    'a_start': [], 'a_finish': [],
+                    'open': [], 'closes': [],
+                    'start': [], 'finish': [], 'end': []}
+
+        for t in self.traverses:
+            _elevation = t.mean_elevation
+            _k = t.k
+            _scalars['elevation'].append(_elevation)
+            _scalars['elevation_exact'].append(
+                not isinstance(_elevation, np.generic))
+            _scalars['k'].append(_k)
+            _scalars['k_exact'].append(not isinstance(_k, np.generic))
+            _scalars['a_start'].append(t.a_start.value)
+            _scalars['a_finish'].append(t.a_finish.value)
+            _scalars['open'].append(isinstance(t, OpenTraverse))
+            _scalars['closes'].append(not isinstance(t.l1, NonePoint))
+            _scalars['start'].append(t.f2)
+            # misclosures are taken on l1 whenever it is given, the last
+            # station only ends on it for link traverses
+            _scalars['finish'].append(
+                t.f2 if isinstance(t.l1, NonePoint) else t.l1)
+            _scalars['end'].append(
+                t.l1 if isinstance(t, LinkTraverse) else t.f2)
+
+        return {key: np.array(value) if key not in ('start', 'finish', 'end')
+                else value for key, value in _scalars.items()}
+
+    def compute(self, update: bool = True) -> Tuple[pd.DataFrame,
+                                                    pd.DataFrame]:
+        """
+        :param update: bool
+            Also store the results on every traverse (traverse table,
+            stations, metrics), as compute() does.
+        :return: Tuple[pd.DataFrame, pd.DataFrame]
+            Rows of all traverses and one metrics row per traverse.
+        """
+
+        if not self.traverses:
+            self.results = pd.DataFrame(columns=BATCH_COLUMNS)
+            self.metrics = pd.DataFrame(columns=METRICS_COLUMNS)
+            return self.results, self.metrics
+
+        _off = self.offsets
+        _lengths = np.diff(_off)
+        _last = _off[1:] - 1
+        _s = self._scalars()
+
+        def _rows(values):
+            return np.repeat(values, _lengths)
+
+        table = pd.concat([t.traverse for t in self.traverses],
+                          ignore_index=True)
+
+        h_angle = resolve_angle(table['h_angle'].values)
+        h_dist = table['h_dist'].values.astype(float)
+        dz_temp = table['dz_temp'].values.astype(float)
+        h_dist[_last] = np.nan
+        dz_temp[_last] = np.nan
+
+        ref_dist = _scale(h_dist,
+                          _rows(EARTH_C / (EARTH_C + _s['elevation'])),
+                          _rows(_s['elevation_exact']))
+        egsa_dist = _scale(ref_dist, _rows(_s['k']), _rows(_s['k_exact']))
+        length = np.round(_segment_nansum(egsa_dist, _off), DIST_ROUND)
+
+        # angular misclosure, zero for open traverses and missing finish
+        a_measured = resolve_angle_fast(
+            _s['a_start'] + np.round(_segment_nansum(h_angle, _off),
+                                     ANGLE_ROUND) + _lengths * 200)
+        angular = np.where(_s['a_finish'] != 0,
+                           np.round(_s['a_finish'] - a_measured,
+                                    ANGLE_ROUND), 0.0)
+        correction = np.round(angular / _lengths, ANGLE_ROUND)
+        correction[_s['open']] = 0.0
+
+        h_angle_fixed = resolve_angle(h_angle + _rows(correction))
+        h_angle_fixed[_rows(_s['open'])] = h_angle[_rows(_s['open'])]
+
+        azimuths = Azimuths.for_traverses(
+            _s['a_start'], resolve_angle(h_angle_fixed), _off)
+
+        dx_temp = egsa_dist * azimuths.sin
+        dy_temp = egsa_dist * azimuths.cos
+
+        start = Points._coordinates(_s['start'])
+        finish = Points._coordinates(_s['finish'])
+
+        deltas = []
+        misclosures = []
+        reached = []
+        for _temp, _start, _finish in ((dx_temp, start[0], finish[0]),
+                                       (dy_temp, start[1], finish[1]),
+                                       (dz_temp, start[2], finish[2])):
+            _reached = _start + np.round(_segment_nansum(_temp, _off),
+                                         DIST_ROUND)
+            _w = np.where(_s['closes'],
+                          np.round(_finish - _reached, DIST_ROUND), 0.0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                _cor = np.round(_w / length, DIST_ROUND)
+            _delta = _temp + _rows(_cor) * egsa_dist
+            _open = _rows(_s['open'])
+            _delta[_open] = _temp[_open]
+            deltas.append(_delta)
+            misclosures.append(_w)
+            reached.append(_reached)
+
+        dx, dy, dz = deltas
+        wx, wy, wz = misclosures
+
+        stations = Points.from_traverse(_s['start'], _s['end'],
+                                        dx, dy, dz, _off)
+
+        names = [t.name for t in self.traverses]
+
+        results = pd.DataFrame(index=table.index)
+        results['traverse'] = np.repeat(np.array(names, dtype=object),
+                                        _lengths)
+        if 'mid' in table.columns:
+            results['mid'] = table['mid'].values
+        for column in ('bs', 'station', 'fs'):
+            results[column] = table[column].values
+        results['h_dist'] = h_dist
+        results['surf_dist'] = ref_dist
+        results['egsa_dist'] = egsa_dist
+        results['h_angle'] = h_angle
+        results['h_angle_fixed'] = np.where(_rows(_s['open']), np.nan,
+                                            h_angle_fixed)
+        results['azimuth'] = azimuths.values
+        results['dX'] = dx
+        results['dY'] = dy
+        results['dZ'] = dz
+        results['X'] = stations.x
+        results['Y'] = stations.y
+        results['Z'] = stations.z
+
+        _open = _s['open']
+        metrics = pd.DataFrame(
+            {'traverse': names,
+             'stations': [t.stops_count for t in self.traverses],
+             'length': length,
+             'mean_elev': _s['elevation'].astype(float),
+             'angular': np.where(_open, np.nan, angular),
+             'horizontal': np.where(_open, np.nan,
+                                    np.round(np.sqrt(wx ** 2 + wy ** 2),
+                                             DIST_ROUND)),
+             'wx': np.where(_open, np.nan, wx),
+             'wy': np.where(_open, np.nan, wy),
+             'wz': np.where(_open, np.nan, wz)},
+            columns=METRICS_COLUMNS)
+        metrics.index = metrics.index + 1
+
+        self.results = results
+        self.metrics = metrics
+
+        if update:
+            self._update(reached)
+
+        return results, metrics
+
+    def _update(self, reached: List[np.ndarray]):
+        _columns = {c: self.results[c].values for c in self.results.columns}
+        _metrics = {c: self.metrics[c].values for c in METRICS_COLUMNS}
+
+        for i, t in enumerate(self.traverses):
+            _a, _b = self.offsets[i], self.offsets[i + 1]
+
+            _values = {'length': _metrics['length'][i]}
+            if not isinstance(t, OpenTraverse):
+                _values['_l1_temp_x'] = reached[0][i]
+                _values['_l1_temp_y'] = reached[1][i]
+                _values['_l1_temp_z'] = reached[2][i]
+
+            keep = [c for c in BATCH_COLUMNS[1:]
+                    if c in _columns and (t.has_mids or c != 'mid')]
+            if isinstance(t, OpenTraverse):
+                keep.remove('h_angle_fixed')
+
+            _values['traverse'] = pd.DataFrame(
+                {c: _columns[c][_a:_b] for c in keep},
+                index=t.traverse.index)
+            _values['metrics'] = pd.DataFrame({c: _metrics[c][i:i + 1]
+                                               for c in METRICS_COLUMNS})
+            _values['stations'] = Container(
+                _values['traverse'][['station', 'X', 'Y', 'Z']])
+
+            t._store(**_values)
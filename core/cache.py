@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+from atsurvey.core.traverse import *
+import hashlib
+import os
+import pickle
+
+
+class TraverseCache:
+    """
+    Solved traverses stored in the project folder, keyed by a hash of
+    everything their result depends on: library version, traverse type,
+    stops, picked measurement rows and start/finish coordinates. A changed
+    input gives a new key, so entries never go stale, they are only
+    evicted (least recently used first) above 'max_size' bytes.
+    """
+
+    def __init__(self,
+                 folder: Union[str, Path],
+                 max_size: int = ATT_CACHE_SIZE):
+        self.folder = Path(folder).joinpath('traverses')
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return f"TraverseCache({self.hits} hits, {self.misses} misses)"
+
+    def __len__(self) -> int:
+        return len(self._files())
+
+    def _files(self) -> List[Path]:
+        return list(self.folder.glob(f"*{ATT_CACHE_EXT}"))
+
+    def _path(self, key: str) -> Path:
+        return self.folder.joinpath(f"{key}{ATT_CACHE_EXT}")
+
+    @staticmethod
+    def key(measurements: MeasurementTable,
+            t_type: str,
+            stops: list,
+            start: List[Point],
+            finish: List[Point] = None) -> str:
+        _hash = hashlib.sha256(
+            f"{ATT_VERSION}|{t_type}|{'-'.join(stops)}".encode())
+
+        for point in list(start) + list(finish or []):
+            _hash.update(np.array([point.x, point.y, point.z],
+                                  dtype=float).tobytes())
+
+        _rows = measurements._take(measurements.rows(stops))
+        _hash.update('|'.join(map(str, _rows.columns)).encode())
+        _hash.update(pd.util.hash_pandas_object(_rows).values.tobytes())
+
+        return _hash.hexdigest()
+
+    def get(self, key: str) -> Union[tuple, None]:
+        _path = self._path(key)
+
+        try:
+            with open(_path, 'rb') as entry_file:
+                entry = pickle.load(entry_file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+
+        # recently used, evicted last
+        os.utime(_path)
+        self.hits += 1
+
+        return entry
+
+    def put(self, key: str, entry: tuple):
+        """
+        :param key: str
+            Key of the traverse (see key()).
+        :param entry: tuple
+            (traverse, table columns, info columns). The measurements of
+            the traverse are not stored.
+        """
+
+        traverse = entry[0]
+        _data = traverse.data
+        traverse.data = None
+
+        _path = self._path(key)
+        _temp = _path.with_suffix('.tmp')
+
+        try:
+            with open(_temp, 'wb') as entry_file:
+                pickle.dump(entry, entry_file)
+            os.replace(_temp, _path)
+        finally:
+            traverse.data = _data
+
+    def evict(self) -> int:
+        """
+        Removes the least recently used entries until the cache fits in
+        'max_size'.
+
+        :return: int
+            Number of removed entries.
+        """
+
+        _files = sorted(((f, f.stat()) for f in self._files()),
+                        key=lambda x: x[1].st_mtime)
+        _size = sum(stat.st_size for _, stat in _files)
+
+        removed = 0
+        for _file, stat in _files:
+            if _size <= self.max_size:
+                break
+            _file.unlink()
+            _size -= stat.st_size
+            removed += 1
+
+        return removed
+
+    def clear(self):
+        for _file in self._files():
+            _file.unlink()
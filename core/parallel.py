@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+from atsurvey.core.traverse import *
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+# columns a traverse reads from the measurement table
+SHARED_COLUMNS = ['mid', 'h_angle', 'stop_dist', 'stop_dh']
+
+_WORKER_TABLE = None
+
+
+class SharedMeasurements:
+    """
+    The arrays of a MeasurementTable that traverses read, copied once
+    into shared memory blocks.
+
+    Object columns are stored as integer codes and their unique values
+    travel with the spec, which is sent once to each worker instead of
+    with every task. Use as a context manager, the blocks are released
+    on exit.
+    """
+
+    def __init__(self, table: MeasurementTable):
+        self.blocks = []
+        self.spec = {'names': table.names,
+                     'columns': [c for c in SHARED_COLUMNS
+                                 if c in table.df.columns],
+                     'arrays': {}}
+
+        _arrays = {'keys': table._keys,
+                   'order': table._order,
+                   'bs': table.codes['bs'],
+                   'station': table.codes['station'],
+                   'fs': table.codes['fs']}
+        _arrays.update({c: table._columns[c] for c in self.spec['columns']})
+
+        for name, values in _arrays.items():
+            self._share(name, values)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _share(self, name: str, values: np.ndarray):
+        uniques = None
+        if values.dtype == object:
+            values, uniques = pd.factorize(values)
+
+        block = shared_memory.SharedMemory(create=True,
+                                           size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype,
+                   buffer=block.buf)[:] = values
+
+        self.blocks.append(block)
+        self.spec['arrays'][name] = (block.name, values.shape,
+                                     values.dtype.str, uniques)
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+class WorkerMeasurements(MeasurementTable):
+    """
+    MeasurementTable side of a worker process, reading the shared arrays
+    of a SharedMeasurements spec.
+    """
+
+    def __init__(self, spec: dict):
+        self.blocks = []
+        self.names = spec['names']
+        self._codes = dict(zip(self.names.tolist(), range(self.names.size)))
+        self._shared_columns = spec['columns']
+        self._arrays = {}
+        self._uniques = {}
+
+        for name, (block_name, shape, dtype, uniques) in \
+                spec['arrays'].items():
+            # the main process owns the block and unlinks it
+            block = shared_memory.SharedMemory(name=block_name)
+            self.blocks.append(block)
+            self._arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype),
+                                            buffer=block.buf)
+            self._uniques[name] = uniques
+
+        self.codes = {c: self._arrays[c] for c in ('bs', 'station', 'fs')}
+        self._keys = self._arrays['keys']
+        self._order = self._arrays['order']
+
+    def __len__(self) -> int:
+        return self._keys.size
+
+    def _values(self, name: str, rows: np.ndarray) -> np.ndarray:
+        if self._uniques[name] is None:
+            return self._arrays[name][rows]
+        return np.asarray(self._uniques[name], dtype=object)[
+            self._arrays[name][rows]]
+
+    def _take(self, rows: np.ndarray) -> pd.DataFrame:
+        _data = {}
+        if 'mid' in self._shared_columns:
+            _data['mid'] = self._values('mid', rows)
+        for c in ('bs', 'station', 'fs'):
+            _data[c] = np.asarray(self.names, dtype=object)[self.codes[c][rows]]
+        for c in self._shared_columns:
+            if c != 'mid':
+                _data[c] = self._values(c, rows)
+
+        # indexed by table position, the main process maps them back
+        return pd.DataFrame(_data, index=rows).infer_objects()
+
+    def format(self, stops: list) -> TraverseFormatter:
+        _data = self._take(self.rows(stops))
+        _data['angle'] = TraverseFormatter.angle_keys(_data['bs'],
+                                                      _data['station'],
+                                                      _data['fs'])
+        _pairs, _data['dist'] = TraverseFormatter.pair_keys(_data['station'],
+                                                            _data['fs'])
+
+        return TraverseFormatter.from_reduced(_data, _pairs).aggregate()
+
+    def missing_angles(self, stops: list) -> List[str]:
+        missing = []
+        for angle in fmt_angle(stops):
+            _bs, _station, _fs = [self._codes.get(i, -1)
+                                  for i in angle.split('-')]
+            _key = _station * len(self._codes) + _fs
+            _lo = np.searchsorted(self._keys, _key, side='left')
+            _hi = np.searchsorted(self._keys, _key, side='right')
+            if min(_bs, _station, _fs) < 0 or \
+                    not (self.codes['bs'][self._order[_lo:_hi]] == _bs).any():
+                missing.append(angle)
+
+        return missing
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+        self.blocks = []
+
+
+def _init_worker(spec: dict):
+    global _WORKER_TABLE
+    _WORKER_TABLE = WorkerMeasurements(spec)
+
+
+def _format_traverse(stops: list) -> tuple:
+    _traverse = _WORKER_TABLE.format(stops).get_data()
+
+    # only what the main process can't read from its own table
+    return (_traverse.index.values,
+            _traverse['h_dist'].values,
+            _traverse['dz_temp'].values,
+            _WORKER_TABLE.missing_angles(stops))
+
+
+class FormattedMeasurements(MeasurementTable):
+    """
+    MeasurementTable side of the main process for one traverse formatted
+    in a worker.
+
+    The worker only sends the table positions of the traverse rows, their
+    averaged distances and height differences and the missing angles. The
+    other columns are read from the table of the main process, so no
+    frames are pickled.
+    """
+
+    def __init__(self, table: MeasurementTable, formatted: tuple):
+        self.table = table
+        self.positions, self.h_dist, self.dz_temp, self.missing = formatted
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def format(self, stops: list) -> TraverseFormatter:
+        _data = {c: self.table._columns[c][self.positions]
+                 for c in ('mid', 'bs', 'station', 'fs', 'h_angle')}
+        _data['h_dist'] = self.h_dist
+        _data['dz_temp'] = self.dz_temp
+        _traverse = pd.DataFrame(
+            _data, index=self.table.df.index[self.positions]).infer_objects()
+
+        return TraverseFormatter.from_aggregated(_traverse)
+
+    def missing_angles(self, stops: list) -> List[str]:
+        return self.missing
+
+
+class TraversePool:
+    """
+    Process pool building traverses from a MeasurementTable shared once,
+    kept open across several build() calls (e.g. dependency waves). Use
+    as a context manager, the workers and the shared blocks are released
+    on exit.
+    """
+
+    def __init__(self, table: MeasurementTable, workers: int = None):
+        self.table = table
+        self.workers = workers
+        self.shared = None
+        self.pool = None
+
+    def __enter__(self):
+        self.shared = SharedMeasurements(self.table)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers,
+                                        initializer=_init_worker,
+                                        initargs=(self.shared.spec,))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def build(self, tasks: List[tuple]) -> List[Traverse]:
+        """
+        :param tasks: List[tuple]
+            (t_type, stops, start points, finish points, working_dir) of
+            each traverse.
+        :return: List[Traverse]
+            Traverses in the order of 'tasks', reading the table again.
+        """
+
+        if not tasks:
+            return []
+
+        _chunk = max(1, len(tasks) // (4 * (self.workers or os.cpu_count())))
+        formatted = self.pool.map(_format_traverse,
+                                  [stops for _, stops, _, _, _ in tasks],
+                                  chunksize=_chunk)
+
+        traverses = []
+        for (t_type, stops, start, finish, working_dir), _formatted in \
+                zip(tasks, formatted):
+            traverse = make_traverse(
+                t_type, stops, FormattedMeasurements(self.table, _formatted),
+                start, finish, working_dir)
+            traverse.data = self.table
+            traverses.append(traverse)
+
+        return traverses
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if self.shared is not None:
+            self.shared.close()
+            self.shared = None
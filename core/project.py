@@ -1,7 +1,14 @@
 # -*- coding: utf-8 -*-
 from atsurvey.core.traverse import *
+from atsurvey.core.adjustment import *
+from atsurvey.core.batch import *
+from atsurvey.core.cache import *
+from atsurvey.core.parallel import *
+from atsurvey.core.schedule import *
 from atsurvey.core.sideshot import *
 from atsurvey.core.state import *
+from atsurvey.core.stream import *
+from contextlib import nullcontext
 from functools import partial
 
 
@@ -26,8 +33,18 @@ class SurveyProject:
         self.c_traverses = []
         self.c_traverses_count = 0
         self.c_traverses_info = None
+        self.c_traverses_table = None
         self.c_sideshots = []
         self.c_sideshots_count = 0
+        self.c_sideshots_coincident = None
+        self.c_adjustment = None
+        self.cache = None
+
+        self._duplicates = 'first'
+        self._traverse_results = {}
+        self._sideshot_groups = {}
+        self._sideshot_options = None
+        self._changes = None
 
         self.state = ATTProjectState(self)
         self.pdgui = None
@@ -67,51 +84,294 @@ class SurveyProject:
     def point2obj(self, points: Union[list, tuple]) -> List[Point]:
         return [self.stations[points[0]], self.stations[points[1]]]
 
-    def compute_traverses(self):
-        self.c_traverses = []
-        self.c_traverses_count = 0
-        self.c_traverses_info = None
-        for traverse in self.traverse_list.itertuples():
-            if traverse.compute == 1:
-                if traverse.t_type == 'LinkTraverse':
-                    tr = LinkTraverse(stops=parse_stops(traverse.stations),
-                                      data=self.data,
-                                      start=self.point2obj(
-                                          parse_stops(traverse.stations, 1)),
-                                      finish=self.point2obj(
-                                          parse_stops(traverse.stations, -1)),
-                                      working_dir=self.wd.uwd)
-                elif traverse.t_type == 'ClosedTraverse':
-                    tr = ClosedTraverse(stops=parse_stops(self.stations),
-                                        data=self.data,
-                                        start=self.point2obj(
-                                            parse_stops(traverse.stations, 1)),
-                                        working_dir=self.wd.uwd)
-                else:
-                    tr = OpenTraverse(stops=parse_stops(traverse.stations),
-                                      data=self.data,
-                                      start=self.point2obj(
-                                          parse_stops(traverse.stations, 1)),
-                                      working_dir=self.wd.uwd)
-
-                if tr.is_validated:
-                    tr.compute()
-                else:
-                    pass  # TODO: add warnings
+    @staticmethod
+    def _report_conflicts(container: Container, skip: set = None):
+        _conflicts = [c for c in container.conflicts
+                      if not skip or c not in skip]
+        if _conflicts:
+            print(f"\n[WARNING] - {len(_conflicts)} points were "
+                  f"computed more than once with different coordinates:")
+            print(f"  -> {', '.join(map(str, _conflicts))}")
+            print('=' * 80, end='\n')
+
+    def _compute_rows(self) -> list:
+        return list(self.traverse_list.loc[
+                        lambda x: x['compute'] == 1].itertuples())
+
+    def validate_traverses(self,
+                           measurements: MeasurementTable = None,
+                           verbose: bool = True,
+                           traverses: list = None,
+                           network: bool = True) -> pd.DataFrame:
+        """
+        Dry run of the traverse definitions against the measurements.
+
+        Every traverse marked for computation is checked for its known
+        points, the angles at each stop and the distances of each leg,
+        using set lookups on the measurement table. Nothing is computed.
+
+        :param measurements: MeasurementTable
+            Already built table of the project measurements.
+        :param verbose: bool
+            Print the missing observations of each invalid traverse.
+        :param traverses: list
+            Rows of the traverses sheet to check, all the ones marked for
+            computation if None.
+        :param network: bool
+            Count the stations computed by other traverses as known and
+            schedule the traverses in dependency waves (see
+            traverse_waves). Otherwise only the current stations count.
+        :return: pd.DataFrame
+            One row per traverse with the missing points, angles and
+            distances, whether it can be computed and its wave.
+        """
+
+        if measurements is None:
+            measurements = MeasurementTable(self.data)
+        if traverses is None:
+            traverses = self._compute_rows()
+
+        _waves = {}
+        _blocked = []
+        _available = set()
+        if network:
+            waves, _blocked = traverse_waves(
+                [(t.t_type, t.stations) for t in traverses], self.stations)
+            _waves = {i: w for w, wave in enumerate(waves, 1) for i in wave}
+            _available = {p for i in _waves
+                          for p in computed_points(traverses[i].stations)}
+
+        _report = []
+        for i, traverse in enumerate(traverses):
+            _stops = parse_stops(traverse.stations)
+            _required = required_points(traverse.t_type, traverse.stations)
+
+            _points = [p for p in _required
+                       if p not in self.stations and p not in _available]
+            if i in _blocked and not _points:
+                # waits on a dependency cycle
+                _points = [p for p in _required if p not in self.stations]
+            _angles = measurements.missing_angles(_stops)
+            _dists = measurements.missing_dists(_stops)
+
+            _report.append({'traverse': traverse.stations,
+                            't_type': traverse.t_type,
+                            'missing_points': _points,
+                            'missing_angles': _angles,
+                            'missing_dists': _dists,
+                            'valid': not (_points or _angles or _dists),
+                            'wave': _waves.get(i, np.nan)})
+
+            if verbose and not _report[-1]['valid']:
+                print(f"\n[ERROR] - Traverse can't be computed:\n"
+                      f"  -> {traverse.stations}\n")
+                for _title, _missing in (
+                        ('Unknown start/finish points:', _points),
+                        ('Missing angles from measurements:', _angles),
+                        ('Missing distances from measurements:', _dists)):
+                    if _missing:
+                        print(_title)
+                        for p in _missing:
+                            print(f'  -> ({p})')
+                print('=' * 80, end='\n')
+
+        report = pd.DataFrame(_report,
+                              columns=['traverse', 't_type', 'missing_points',
+                                       'missing_angles', 'missing_dists',
+                                       'valid', 'wave'])
+        report.index = report.index + 1
+
+        return report
+
+    def _traverse_tasks(self, traverses: list) -> List[tuple]:
+        tasks = []
+        for traverse in traverses:
+            if traverse.t_type == 'LinkTraverse':
+                finish = self.point2obj(parse_stops(traverse.stations, -1))
+            else:
+                finish = None
+
+            tasks.append((traverse.t_type,
+                          parse_stops(traverse.stations),
+                          self.point2obj(parse_stops(traverse.stations, 1)),
+                          finish,
+                          self.wd.uwd))
+
+        return tasks
+
+    def _solve_wave(self,
+                    measurements: MeasurementTable,
+                    rows: list,
+                    positions: List[int],
+                    pool: TraversePool = None,
+                    cache: TraverseCache = None) -> dict:
+        """
+        Builds and solves the traverses at 'positions' of 'rows' together.
+        With a cache, unchanged traverses are loaded from it and the
+        solved ones are stored.
+
+        :return: dict
+            position -> (traverse, its rows of the batch table, its
+            metrics row) for every traverse that was computed, rows as
+            column arrays.
+        """
+
+        tasks = dict(zip(positions,
+                         self._traverse_tasks([rows[i] for i in positions])))
+
+        results = {}
+        keys = {}
+        if cache is not None:
+            for i, (t_type, stops, start, finish, _) in tasks.items():
+                keys[i] = cache.key(measurements, t_type, stops, start,
+                                    finish)
+                _entry = cache.get(keys[i])
+                if _entry is not None:
+                    _entry[0].data = measurements
+                    results[i] = _entry
+
+        positions = [i for i in positions if i not in results]
+        tasks = [tasks[i] for i in positions]
+
+        if pool is not None:
+            traverses = pool.build(tasks)
+        else:
+            traverses = [make_traverse(t_type, stops, measurements, start,
+                                       finish, working_dir)
+                         for t_type, stops, start, finish, working_dir
+                         in tasks]
+
+        _solved = [(i, tr) for i, tr in zip(positions, traverses)
+                   if tr.is_validated]
+        if not _solved:
+            return results
+
+        batch = TraverseBatch([tr for _, tr in _solved])
+        _table, _info = batch.compute()
+
+        # column arrays, stacking them is much cheaper than concatenating
+        # one frame per traverse
+        _table = {c: _table[c].values for c in _table.columns}
+        _info = {c: _info[c].values for c in _info.columns}
+
+        for j, (i, tr) in enumerate(_solved):
+            results[i] = (tr,
+                          {c: v[batch.offsets[j]:batch.offsets[j + 1]]
+                           for c, v in _table.items()},
+                          {c: v[j:j + 1] for c, v in _info.items()})
+            if cache is not None:
+                cache.put(keys[i], results[i])
+
+        return results
+
+    @staticmethod
+    def _stack(parts: List[dict]) -> pd.DataFrame:
+        _columns = list(parts[0])
 
-                    self.c_traverses.append(tr)
+        if any(list(part) != _columns for part in parts):
+            return pd.concat([pd.DataFrame(part) for part in parts],
+                             ignore_index=True)
 
-        if self.c_traverses:
-            self.c_traverses_info = pd.concat(
-                [trav.metrics for trav in self.c_traverses]).reset_index(
-                drop=True)
+        return pd.DataFrame({c: np.concatenate([part[c] for part in parts])
+                             for c in _columns})
+
+    def _store_traverses(self, rows: list, results: dict):
+        _positions = sorted(results)
+
+        # kept for recompute(), keyed by the traverse definition
+        self._traverse_results = {(rows[i].t_type, rows[i].stations):
+                                  results[i] for i in _positions}
+
+        self.c_traverses = [results[i][0] for i in _positions]
+        self.c_traverses_count = len(self.c_traverses)
+        self.c_traverses_table = None
+        self.c_traverses_info = None
 
+        if self.c_traverses:
+            self.c_traverses_table = self._stack(
+                [results[i][1] for i in _positions])
+            self.c_traverses_info = self._stack(
+                [results[i][2] for i in _positions])
             self.c_traverses_info.index = self.c_traverses_info.index + 1
 
-            self.stations = self.stations + sum(
-                [trav.stations for trav in self.c_traverses])
+    def compute_traverses(self,
+                          duplicates: str = 'first',
+                          workers: int = None,
+                          cache: bool = False):
+        """
+        Traverses starting or ending on stations of other traverses are
+        computed in dependency waves: the stations of each wave are added
+        to the project stations before the next wave is built, so the
+        whole network is resolved in one call.
+
+        :param duplicates: str
+            Policy for stations computed by more than one traverse, see
+            Container.concat.
+        :param workers: int
+            Build the traverses of each wave in a pool of this many
+            processes (0 for one per CPU). None or 1 builds them in this
+            process. Results are identical either way.
+        :param cache: bool
+            Load unchanged traverses from the project cache (see
+            TraverseCache) and store the solved ones in it. recompute()
+            keeps using it once enabled.
+        """
+
+        if cache and self.cache is None:
+            self.cache = TraverseCache(self.wd.uwd_folder)
+        elif not cache:
+            self.cache = None
+
+        self.c_traverses = []
+        self.c_traverses_count = 0
+        self.c_traverses_info = None
+        self.c_traverses_table = None
+        self._duplicates = duplicates
+        self._changes = None
+        measurements = MeasurementTable(self.data)
+        rows = self._compute_rows()
+        report = self.validate_traverses(measurements, traverses=rows)
+
+        results = {}
+        conflicts = []
+        _parallel = workers is not None and workers != 1
+
+        with (TraversePool(measurements, workers or None) if _parallel
+              else nullcontext()) as pool:
+            for wave, positions in report.loc[report['valid']].groupby(
+                    'wave').groups.items():
+                _positions = [i - 1 for i in positions]
+
+                if wave > 1:
+                    # a traverse of an earlier wave may have failed
+                    _check = self.validate_traverses(
+                        measurements,
+                        traverses=[rows[i] for i in _positions],
+                        network=False)
+                    _positions = [i for i, k in zip(_positions,
+                                                    _check['valid'].values)
+                                  if k]
+
+                _solved = self._solve_wave(measurements, rows, _positions,
+                                           pool, self.cache)
+                if not _solved:
+                    continue
+                results.update(_solved)
+
+                self.stations = Container.concat(
+                    [self.stations] + [_solved[i][0].stations
+                                       for i in sorted(_solved)],
+                    duplicates=duplicates)
+                conflicts.extend(self.stations.conflicts)
+
+        self._store_traverses(rows, results)
+
+        if self.cache is not None:
+            self.cache.evict()
 
-            self.c_traverses_count = len(self.c_traverses)
+        if self.c_traverses:
+            self.stations.conflicts = list(dict.fromkeys(conflicts))
+            self._report_conflicts(self.stations)
 
             self.state.update(self)
 
@@ -119,47 +379,425 @@ class SurveyProject:
         else:
             print("\nNo traverse was computed")
 
-    def compute_sideshots(self, exclude=None):
-        def exclusion(group_check, items):
-            return not bool(set(group_check).intersection(items))
-
-        self.c_sideshots = []
+    def adjust_network(self,
+                       angle_sigma: float = 0.0010,
+                       dist_sigma: float = 0.003,
+                       dist_ppm: float = 2.0,
+                       dh_sigma: float = 0.005,
+                       max_iter: int = 10):
+        """
+        Least-squares adjustment of all the project stations from the whole
+        measurement table (see NetworkAdjustment). The computed stations
+        are the approximate coordinates and the known points stay fixed,
+        so compute_traverses() has to run first. The adjusted coordinates
+        replace the project stations.
+
+        :param angle_sigma: float
+            Standard deviation of a horizontal angle in grads.
+        :param dist_sigma: float
+            Constant part of the standard deviation of a distance (m).
+        :param dist_ppm: float
+            Distance dependent part of the standard deviation of a distance.
+        :param dh_sigma: float
+            Standard deviation of a height difference (m).
+        :param max_iter: int
+            Maximum iterations of the horizontal adjustment.
+        :return: pd.DataFrame
+            Residual of every observation.
+        """
+
+        _fixed = Container(self.known).pointset.names
+
+        if len(self.stations) == len(_fixed):
+            print("\n[ERROR] - No computed stations to adjust. "
+                  "Run compute_traverses() first.")
+            return None
+
+        self.c_adjustment = NetworkAdjustment(MeasurementTable(self.data),
+                                              self.stations,
+                                              _fixed,
+                                              angle_sigma=angle_sigma,
+                                              dist_sigma=dist_sigma,
+                                              dist_ppm=dist_ppm,
+                                              dh_sigma=dh_sigma)
+        self.stations, residuals = self.c_adjustment.adjust(max_iter)
+
+        print(f"[{int(self.c_adjustment.free.sum())}] stations were adjusted "
+              f"from [{residuals.shape[0]}] observations.")
+        print(f"  -> sigma0 horizontal: "
+              f"{self.c_adjustment.sigma0['horizontal']:.3f}")
+        print(f"  -> sigma0 vertical: "
+              f"{self.c_adjustment.sigma0['vertical']:.3f}")
+
+        self.state.update(self)
+
+        return residuals
+
+    def _report_coincident(self, radius: float):
+        _report = self.c_sideshots_coincident
+        if not _report.empty:
+            print(f"\n[WARNING] - {_report['cluster'].max()} groups of "
+                  f"points with different IDs within {radius} of each "
+                  f"other were merged:")
+            for _, names in _report.groupby('cluster')['station']:
+                print(f"  -> {', '.join(map(str, names.unique()))}")
+            print('=' * 80, end='\n')
+
+    def _store_sideshots(self,
+                         groups: dict,
+                         duplicates: str,
+                         radius: float = None):
+        # kept for recompute(), None for setups without known stations
+        self._sideshot_groups = groups
+
+        self.c_sideshots = [ss for ss in groups.values() if ss is not None]
         self.c_sideshots_count = 0
+        self.c_sideshots_coincident = None
 
-        all_groups = self.data.groupby(['station', 'bs'])
+        if self.c_sideshots:
+            _rank = None
+            if duplicates == 'best':
+                # horizontal distance from the setup station
+                _rank = np.concatenate(
+                    [np.hypot(ss.pointset.x - self.stations[group[0]].x,
+                              ss.pointset.y - self.stations[group[0]].y)
+                     for group, ss in groups.items() if ss is not None])
+
+            _near = set()
+            if radius is not None:
+                _all = Container(PointSet.concat(
+                    [ss.pointset for ss in self.c_sideshots]))
+                self.c_sideshots_coincident = _all.coincident(radius)
+                self._report_coincident(radius)
+                _near = set(self.c_sideshots_coincident['station'])
+
+            self.sideshots = Container.concat(self.c_sideshots,
+                                              duplicates=duplicates,
+                                              radius=radius,
+                                              rank=_rank)
+            self._report_conflicts(self.sideshots, skip=_near)
+            self.sideshots.sort()
+            self.c_sideshots_count = len(self.sideshots)
+
+            print(f"[{self.c_sideshots_count}] points were calculated.")
+            self.state.update(self)
+        else:
+            print('No sideshots were computed')
 
+    @staticmethod
+    def _excluded(group: tuple, exclude: Any) -> bool:
         if exclude is None:
-            point_groups = list(all_groups.groups)
+            return False
+
+        if isinstance(exclude, str):
+            _exclude = [exclude]
         else:
-            if isinstance(exclude, str):
-                _exclude = [exclude]
-            else:
-                _exclude = exclude
+            _exclude = exclude
+
+        return bool(set(group).intersection(_exclude))
+
+    def compute_sideshots(self,
+                          exclude=None,
+                          duplicates: str = 'first',
+                          radius: float = None,
+                          workers: int = None):
+        """
+        Solves the sideshots of every setup (station, bs) whose station and
+        backsight are known, in one pass (see SideshotBatch).
+
+        :param exclude: Any
+            Point name(s): setups with one of them as station or backsight
+            are skipped.
+        :param duplicates: str
+            Policy for points measured from more than one setup, see
+            Container.concat. 'best' keeps the observation nearest to its
+            setup station.
+        :param radius: float
+            Also merge points with different IDs within 'radius' of each
+            other, with the same policy. They are listed in
+            'c_sideshots_coincident'.
+        :param workers: int
+            Threads solving setups concurrently, None for one pass.
+        """
+
+        self._sideshot_options = (exclude, duplicates, radius, workers)
+
+        batch = SideshotBatch(self.data, self.stations, exclude)
+        batch.compute(workers)
+
+        groups = dict.fromkeys(
+            [group for group in self.data.groupby(['station', 'bs']).groups
+             if not self._excluded(group, exclude)])
+        groups.update(batch.setup_points())
+
+        self._store_sideshots(groups, duplicates, radius)
+
+    def stream_sideshots(self,
+                         data: Union[str, Path, pd.DataFrame],
+                         name: str = 'Project_Sideshots',
+                         exclude=None,
+                         max_memory: int = ATT_STREAM_MEMORY,
+                         binary: bool = False,
+                         csv_point_id: bool = False,
+                         **kwargs) -> int:
+        """
+        Solves the sideshots of measurements too big to load at once and
+        writes them to the project folder as they are computed, so memory
+        stays bounded by 'max_memory' whatever the size of 'data'. The
+        points are not kept in 'sideshots'.
+
+        The output is raw and unmerged: a point measured from several
+        setups is written once per setup. compute_sideshots resolves them
+        with its 'duplicates' policy, here the file has to be merged
+        afterwards if needed (e.g. with Container.concat).
+
+        :param data: Union[str, Path, pd.DataFrame]
+            Measurements, a '.csv' file is read in chunks.
+        :param name: str
+            Output file name, '.csv' or ATT_CHUNK_EXT if 'binary'.
+        :param exclude: Any
+            Point name(s): setups with one of them as station or
+            backsight are skipped.
+        :param max_memory: int
+            Bytes a chunk may take while solved.
+        :param binary: bool
+            Write the full result chunks (see ChunkWriter) instead of
+            the X, Y, Z of the points.
+        :param csv_point_id: bool
+            Write the point names as the first csv column.
+        :return: int
+            Number of rows written, repeated points included.
+        """
+
+        _ext = ATT_CHUNK_EXT if binary else '.csv'
+        _dst = self.wd.uwd.joinpath(f'{name}{_ext}')
+
+        with ChunkWriter(_dst, names='fs', point_id=csv_point_id) as writer:
+            for chunk in stream_sideshots(data, self.stations, exclude,
+                                          max_memory, **kwargs):
+                writer.write(chunk)
+
+        print(f"[{writer.rows}] points were calculated (not merged).")
+
+        return writer.rows
 
-            part_exclusion = partial(exclusion, items=_exclude)
-            point_groups = list(filter(part_exclusion, all_groups.groups))
+    @staticmethod
+    def _changed_rows(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+        """
+        Rows of 'old' and 'new' that are not in both of them (edited rows
+        show up on both sides), compared by row hashes.
+        """
 
-        for group in point_groups:
-            if group in self.stations:
-                _data = all_groups.get_group(group)
+        if list(old.columns) != list(new.columns):
+            return pd.concat([old, new])
 
-                ss = Sideshot(_data,
-                              self.stations[group[0]],
-                              self.stations[group[1]])
+        if old.index.equals(new.index):
+            # edited in place, compare cell by cell
+            _diff = np.zeros(new.shape[0], dtype=bool)
+            for c in new.columns:
+                _a, _b = old[c].values, new[c].values
+                _diff |= (_a != _b) & ~(pd.isna(_a) & pd.isna(_b))
 
-                ss.compute()
+            return pd.concat([old.loc[_diff], new.loc[_diff]])
 
-                self.c_sideshots.append(ss)
+        _old = pd.util.hash_pandas_object(old, index=False)
+        _new = pd.util.hash_pandas_object(new, index=False)
 
-        if self.c_sideshots:
-            self.sideshots = sum([s.points for s in self.c_sideshots])
-            self.sideshots.sort()
-            self.c_sideshots_count = len(self.sideshots)
+        # counts, so that removing one of two identical rows shows too
+        _counts = _old.value_counts().sub(_new.value_counts(), fill_value=0)
+        _changed = _counts.index[_counts != 0]
 
-            print(f"[{self.c_sideshots_count}] points were calculated.")
-            self.state.update(self)
-        else:
-            print('No sideshots were computed')
+        return pd.concat([old.loc[_old.isin(_changed).values],
+                          new.loc[_new.isin(_changed).values]])
+
+    @staticmethod
+    def _moved_points(old: Container, new: Container) -> set:
+        """
+        Names of the points added, removed or with other coordinates.
+        """
+
+        _old = old.data
+        _new = new.data
+        _old = _old.loc[~_old.index.duplicated()]
+        _new = _new.loc[~_new.index.duplicated()]
+
+        _common = _old.index.intersection(_new.index)
+        _a = _old.loc[_common].values
+        _b = _new.loc[_common].values
+        _same = (_a == _b) | (np.isnan(_a) & np.isnan(_b))
+
+        return (set(_old.index) ^ set(_new.index)) | \
+            set(_common[~_same.all(axis=1)])
+
+    def track_changes(self,
+                      data: Any = None,
+                      traverses: Any = None,
+                      known_points: Any = None):
+        """
+        Replaces the measurements, traverse definitions and/or known points
+        of the project and records what changed, for recompute().
+
+        Changes add up until the next computation.
+
+        :param data: Any
+            New measurements.
+        :param traverses: Any
+            New traverses sheet. Its definitions are compared with the
+            computed traverses by recompute().
+        :param known_points: Any
+            New known points.
+        """
+
+        if self._changes is None:
+            self._changes = {'rows': set(), 'points': set()}
+
+        if data is not None:
+            _data = load_data(data)
+            _changed = self._changed_rows(self.data, _data)
+            self._changes['rows'].update(zip(_changed['bs'].tolist(),
+                                             _changed['station'].tolist(),
+                                             _changed['fs'].tolist()))
+            self.data = _data
+
+        if traverses is not None:
+            self.traverse_list = load_data(traverses)
+
+        if known_points is not None:
+            _known = load_data(known_points)
+            self._changes['points'].update(
+                self._moved_points(Container(self.known), Container(_known)))
+            self.known = _known
+
+    def recompute(self):
+        """
+        Recomputes only what the changes recorded by track_changes() (or
+        save_changes()) affect:
+
+        - traverses with edited measurement rows, new or redefined ones
+          and those starting or ending on points that moved, wave by wave,
+          from the measurement rows of their stops only
+        - sideshot groups with edited rows or whose station or backsight
+          moved
+
+        Everything else is reused, and the results are the same as
+        computing the whole project again.
+        """
+
+        if self._changes is None:
+            print("\nNo changes since the last computation")
+            return None
+
+        rows = self._compute_rows()
+        edited = self._changes['rows']
+        moved = set(self._changes['points'])
+        previous = self._traverse_results
+
+        results = {}
+        conflicts = []
+        self.stations = Container(self.known)
+
+        waves, blocked = traverse_waves(
+            [(t.t_type, t.stations) for t in rows], self.stations)
+
+        for positions in waves:
+            _todo = []
+            for i in positions:
+                _key = (rows[i].t_type, rows[i].stations)
+                _stops = set(parse_stops(rows[i].stations))
+
+                if _key in previous and \
+                        not moved.intersection(required_points(*_key)) and \
+                        not any(_stops.issuperset(r) for r in edited):
+                    results[i] = previous[_key]
+                else:
+                    _todo.append(i)
+
+            if _todo:
+                _stops = set().union(*(parse_stops(rows[i].stations)
+                                       for i in _todo))
+                measurements = MeasurementTable(
+                    self.data.loc[self.data['station'].isin(_stops)])
+                _check = self.validate_traverses(
+                    measurements,
+                    traverses=[rows[i] for i in _todo],
+                    network=False)
+                _solved = self._solve_wave(
+                    measurements, rows,
+                    [i for i, k in zip(_todo, _check['valid'].values) if k],
+                    cache=self.cache)
+                results.update(_solved)
+
+                for i in _todo:
+                    _key = (rows[i].t_type, rows[i].stations)
+                    _old = previous[_key][0].stations if _key in previous \
+                        else Container()
+                    _new = _solved[i][0].stations if i in _solved \
+                        else Container()
+                    moved |= self._moved_points(_old, _new)
+
+            _wave = [results[i][0].stations for i in positions
+                     if i in results]
+            if _wave:
+                self.stations = Container.concat([self.stations] + _wave,
+                                                 duplicates=self._duplicates)
+                conflicts.extend(self.stations.conflicts)
+
+        _current = {(rows[i].t_type, rows[i].stations) for i in results}
+        for _key in previous:
+            if _key not in _current:
+                moved |= set(previous[_key][0].stations.pointset.names)
+
+        if blocked:
+            self.validate_traverses(MeasurementTable(self.data.loc[
+                self.data['station'].isin(set().union(
+                    *(parse_stops(rows[i].stations) for i in blocked)))]),
+                traverses=[rows[i] for i in blocked], network=False)
+
+        self._store_traverses(rows, results)
+        if self.cache is not None:
+            self.cache.evict()
+        self.stations.conflicts = list(dict.fromkeys(conflicts))
+        self._report_conflicts(self.stations)
+
+        if self._sideshot_options is not None:
+            self._recompute_sideshots(edited, moved)
+
+        self._changes = None
+        self.state.update(self)
+
+        if self.c_traverses:
+            return styler(self.c_traverses_info, traverse_formatter)
+
+    def _recompute_sideshots(self, edited: set, moved: set):
+        exclude, duplicates, radius, workers = self._sideshot_options
+        groups = dict(self._sideshot_groups)
+
+        _edited = {(station, bs) for bs, station, _ in edited}
+        dirty = {group for group in set(groups) | _edited
+                 if not self._excluded(group, exclude) and
+                 (group in _edited or moved.intersection(group))}
+
+        if dirty:
+            _data = self.data.loc[self.data['station'].isin(
+                {group[0] for group in dirty})]
+            _present = set(_data.groupby(['station', 'bs']).groups)
+
+            batch = SideshotBatch(_data, self.stations, exclude)
+            batch.compute(workers)
+            _solved = batch.setup_points()
+
+            for group in dirty:
+                if group in _present:
+                    groups[group] = _solved.get(group)
+                else:
+                    groups.pop(group, None)
+
+        # same order as the groups of compute_sideshots()
+        if groups:
+            groups = {group: groups[group] for group in
+                      pd.MultiIndex.from_tuples(list(groups)).sort_values()}
+
+        self._store_sideshots(groups, duplicates, radius)
 
     def export_traverses(self):
         _out = self.wd.uwd.joinpath('Project_Traverses.xlsx')
@@ -193,7 +831,18 @@ class SurveyProject:
                           sideshots)
 
     def save_changes(self):
-        self.stations = Container(self.pdgui.get_dataframes()['known_points'])
-        self.traverse_list = self.pdgui.get_dataframes()['traverses']
-        self.data = self.pdgui.get_dataframes()['measurements']
-        self.sideshots = Container(self.pdgui.get_dataframes()['sideshots'])
+        _frames = self.pdgui.get_dataframes()
+
+        # stations computed by traverses are not known points
+        _computed = {p for t in self.c_traverses
+                     for p in t.stations.pointset.names.tolist()}
+        _computed -= set(Container(self.known).pointset.names.tolist())
+        _stations = Container(_frames['known_points']).data
+
+        self.track_changes(data=_frames['measurements'],
+                           traverses=_frames['traverses'],
+                           known_points=_stations.loc[
+                               ~_stations.index.isin(_computed)].reset_index())
+
+        self.stations = Container(_frames['known_points'])
+        self.sideshots = Container(_frames['sideshots'])
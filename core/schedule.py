@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+from atsurvey.util.misc import *
+from typing import Any, Iterable, Tuple
+
+
+def required_points(t_type: str, stations: str) -> List[str]:
+    """
+    Fixed points a traverse starts (and, for link traverses, ends) on.
+    """
+
+    _required = parse_stops(stations, 1)
+    if t_type == 'LinkTraverse':
+        _required = _required + parse_stops(stations, -1)
+
+    return _required
+
+
+def computed_points(stations: str) -> List[str]:
+    """
+    Stations a traverse gives coordinates to (every stop between the first
+    and the last one).
+    """
+
+    return parse_stops(stations)[1:-1]
+
+
+def traverse_waves(traverses: Iterable[Tuple[str, str]],
+                   known: Any) -> Tuple[List[List[int]],
+                                                  List[int]]:
+    """
+    Orders traverses that start or end on stations of other traverses.
+
+    A traverse depends on the first traverse (in the given order) that
+    computes each of its fixed points that is not already known. Traverses
+    are grouped in topological waves: every wave only depends on earlier
+    waves, so the traverses of a wave are independent of each other.
+
+    :param traverses: Iterable[Tuple[str, str]]
+        (t_type, stations) of each traverse, stations as in the traverses
+        sheet ('A-B-C-...').
+    :param known: Any
+        Points with known coordinates, anything supporting 'in' on point
+        names (set, Container).
+    :return: Tuple[List[List[int]], List[int]]
+        Waves of traverse positions, and the positions of the traverses
+        that can't be scheduled (a fixed point no traverse computes, or a
+        dependency cycle).
+    """
+
+    _traverses = list(traverses)
+
+    producers = {}
+    for i, (_, stations) in enumerate(_traverses):
+        for point in computed_points(stations):
+            producers.setdefault(point, []).append(i)
+
+    depends = []
+    blocked = set()
+    for i, (t_type, stations) in enumerate(_traverses):
+        _depends = set()
+        for point in required_points(t_type, stations):
+            if point in known:
+                continue
+            _producers = [j for j in producers.get(point, []) if j != i]
+            if _producers:
+                _depends.add(_producers[0])
+            else:
+                blocked.add(i)
+        depends.append(_depends)
+
+    waves = []
+    done = set()
+    pending = [i for i in range(len(_traverses)) if i not in blocked]
+
+    while pending:
+        _wave = [i for i in pending if depends[i] <= done]
+        if not _wave:
+            break
+        waves.append(_wave)
+        done.update(_wave)
+        pending = [i for i in pending if i not in done]
+
+    # waiting on a cycle or on a blocked traverse
+    blocked.update(pending)
+
+    return waves, sorted(blocked)
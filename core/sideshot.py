@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from atsurvey.primitives import *
+from concurrent.futures import ThreadPoolExecutor
 
 
 class Sideshot(object):
@@ -67,3 +68,185 @@ class Sideshot(object):
                point_id: bool = False):
         self.points.to_csv(dst=dst, name=name, decimals=decimals,
                            point_id=point_id)
+
+
+SIDESHOT_COLUMNS = ['station', 'bs', 'fs',
+                    'h_dist', 'surf_dist', 'egsa_dist', 'azimuth',
+                    'X', 'Y', 'Z']
+
+
+class SideshotBatch:
+    """
+    Solves the sideshots of every setup (station, bs) of a measurement
+    table at once.
+
+    Station and backsight coordinates are joined to the rows once, and
+    the orientation, reductions and coordinates of all rows are computed
+    in one vectorized pass. Results are identical to building a Sideshot
+    for every setup and calling compute().
+
+    :param data: pd.DataFrame
+        Measurements.
+    :param stations: Container
+        Points the setups are oriented on.
+    :param exclude: Any
+        Point name(s): setups with one of them as station or backsight
+        are skipped.
+    """
+
+    def __init__(self,
+                 data: pd.DataFrame,
+                 stations: Container,
+                 exclude: Any = None):
+        self.data = data
+        self.stations = stations
+        if isinstance(exclude, str):
+            self.exclude = [exclude]
+        else:
+            self.exclude = list(exclude) if exclude is not None else []
+
+        self.groups = []
+        self.offsets = None
+        self.results = None
+        self.points = None
+
+    def _setups(self) -> Tuple[np.ndarray, list, dict]:
+        # setup of every row, numbered in (station, bs) order like groupby
+        codes = {}
+        names = {}
+        for column in ('station', 'bs'):
+            codes[column], names[column] = pd.factorize(self.data[column],
+                                                        sort=True)
+
+        _n = max(len(names['bs']), 1)
+        _keys = codes['station'].astype(np.int64) * _n + codes['bs']
+        _keys[(codes['station'] < 0) | (codes['bs'] < 0)] = -1
+
+        uniques, setups = np.unique(_keys, return_inverse=True)
+        setups = setups.reshape(-1)
+        if uniques.size and uniques[0] == -1:
+            setups = setups - 1
+            uniques = uniques[1:]
+
+        keys = list(zip(names['station'][uniques // _n],
+                        names['bs'][uniques % _n]))
+
+        # point row of each name, looked up once per name
+        _index = self.stations.pointset.index
+        positions = {column: np.array([_index.get(i, -1)
+                                       for i in names[column]] + [-1],
+                                      dtype=np.int64)[codes[column]]
+                     for column in ('station', 'bs')}
+
+        return setups, keys, positions
+
+    def _chunks(self, workers: int = None) -> List[Tuple[int, int]]:
+        # ranges of whole setups with about the same number of rows
+        _total = int(self.offsets[-1])
+        if not workers or workers < 2 or self.offsets.size < 3:
+            return [(0, _total)]
+
+        _targets = np.linspace(0, _total, workers + 1)[1:-1]
+        _bounds = self.offsets[np.searchsorted(self.offsets, _targets)]
+        _bounds = np.unique(np.concatenate(([0], _bounds, [_total])))
+
+        return list(zip(_bounds[:-1], _bounds[1:]))
+
+    def _solve(self, rows: np.ndarray, positions: dict) -> dict:
+        _points = self.stations.pointset
+        _s = positions['station'][rows]
+        _b = positions['bs'][rows]
+
+        sx, sy, sz = _points.x[_s], _points.y[_s], _points.z[_s]
+        bx, by, bz = _points.x[_b], _points.y[_b], _points.z[_b]
+
+        # setup scalars, rounded like the numpy scalars of Sideshot
+        a = resolve_angle_fast(determine_quartile(bx - sx, by - sy))
+        mean_elevation = np.round((sz + bz) / 2, 3)
+        k = calc_k(sx, bx, exact=False)
+
+        def _column(name):
+            return self.data[name].values[rows]
+
+        v_angles = Angles(_column('v_angle'))
+        h_angles = Angles(_column('h_angle'))
+        s_dist = SlopeDistances(_column('slope_dist'))
+        h_dist = s_dist.to_horizontal(v_angles).values
+        ref_dist = round_fast(h_dist * (EARTH_C / (EARTH_C + mean_elevation)),
+                              DIST_ROUND)
+        egsa_dist = round_fast(ref_dist * k, DIST_ROUND)
+        azimuths = Azimuths(a + h_angles.values + 200).values
+
+        return {'station': _column('station'),
+                'bs': _column('bs'),
+                'fs': _column('fs'),
+                'h_dist': h_dist,
+                'surf_dist': ref_dist,
+                'egsa_dist': egsa_dist,
+                'azimuth': azimuths,
+                'X': calc_X(sx, egsa_dist, azimuths),
+                'Y': calc_Y(sy, egsa_dist, azimuths),
+                'Z': calc_Z(sz,
+                            _column('slope_dist'),
+                            _column('v_angle'),
+                            _column('station_h'),
+                            _column('target_h'))}
+
+    def compute(self, workers: int = None) -> pd.DataFrame:
+        """
+        :param workers: int
+            Threads solving setups concurrently, None or 1 for one pass.
+            Setups are split in ranges of about the same number of rows,
+            and the results are the same whatever the number of workers.
+        :return: pd.DataFrame
+            One row per sideshot measurement of the solved setups, setup
+            by setup, with the original index.
+        """
+
+        setups, keys, positions = self._setups()
+        _exclude = set(self.exclude)
+
+        solved = np.array([not _exclude.intersection(key) and
+                           key in self.stations for key in keys],
+                          dtype=bool)
+        self.groups = [key for key, ok in zip(keys, solved) if ok]
+
+        # rows without a setup (-1) read the appended False
+        _selected = np.flatnonzero(np.append(solved, False)[setups])
+        rows = _selected[np.argsort(setups[_selected], kind='stable')]
+
+        _, _counts = np.unique(setups[rows], return_counts=True)
+        self.offsets = np.concatenate(([0], np.cumsum(_counts)))
+
+        _chunks = self._chunks(workers)
+        if len(_chunks) > 1:
+            # numpy releases the GIL in the array kernels
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(
+                    lambda chunk: self._solve(rows[chunk[0]:chunk[1]],
+                                              positions), _chunks))
+            _columns = {c: np.concatenate([part[c] for part in parts])
+                        for c in SIDESHOT_COLUMNS}
+        else:
+            _columns = self._solve(rows, positions)
+
+        results = pd.DataFrame(_columns,
+                               index=self.data.index[rows],
+                               columns=SIDESHOT_COLUMNS)
+
+        self.results = results
+        self.points = PointSet(_columns['fs'], results['X'].values,
+                               results['Y'].values, results['Z'].values)
+
+        return results
+
+    def setup_points(self) -> dict:
+        """
+        :return: dict
+            (station, bs) -> points of that setup, for the solved setups.
+        """
+
+        return {key: Container(self.points.take(slice(i, j)))
+                for key, i, j in zip(self.groups,
+                                     self.offsets[:-1],
+                                     self.offsets[1:])}
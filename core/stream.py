@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from atsurvey.core.sideshot import *
+
+# bytes a measurement row takes while its chunk is solved: the input
+# columns, the intermediate arrays of SideshotBatch and the results
+# (about 650 measured, the rest for longer point names)
+STREAM_ROW_BYTES = 1024
+
+
+def chunk_rows(max_memory: int = ATT_STREAM_MEMORY) -> int:
+    """
+    Rows per chunk so that solving a chunk stays within 'max_memory'
+    bytes.
+    """
+
+    return max(1, int(max_memory) // STREAM_ROW_BYTES)
+
+
+def stream_sideshots(data: Union[str, Path, pd.DataFrame],
+                     stations: Container,
+                     exclude: Any = None,
+                     max_memory: int = ATT_STREAM_MEMORY,
+                     chunk_size: int = None,
+                     **kwargs: Any) -> Iterator[pd.DataFrame]:
+    """
+    Solves sideshots chunk by chunk, without loading all measurements.
+
+    Every row only needs the coordinates of its station and backsight, so
+    a setup split between two chunks gives the same numbers as when
+    solved at once (see SideshotBatch). Rows come out setup by setup
+    within each chunk.
+
+    The results are raw: a point measured from several setups comes out
+    once per setup, no duplicates policy is applied (unlike
+    SurveyProject.compute_sideshots), as that would need every point in
+    memory.
+
+    :param data: Union[str, Path, pd.DataFrame]
+        Measurements, see iter_data for the sources read in chunks.
+    :param stations: Container
+        Points the setups are oriented on.
+    :param exclude: Any
+        Point name(s): setups with one of them as station or backsight
+        are skipped.
+    :param max_memory: int
+        Bytes a chunk may take while solved, sets the chunk size.
+    :param chunk_size: int
+        Rows per chunk, overrides 'max_memory'.
+    :param kwargs: Any
+        Passed to the reader (e.g. pd.read_csv).
+    :return: Iterator[pd.DataFrame]
+        SideshotBatch results of each chunk with solved rows, repeated
+        points included.
+    """
+
+    _size = chunk_size if chunk_size is not None else chunk_rows(max_memory)
+
+    for chunk in iter_data(data, _size, **kwargs):
+        results = SideshotBatch(chunk, stations, exclude).compute()
+
+        if not results.empty:
+            yield results
@@ -2,7 +2,121 @@
 from typing import List, Tuple
 from atsurvey.primitives import *
 from atsurvey.util.paths import *
-from atsurvey.converter.formater import TraverseFormatter
+from atsurvey.converter.formater import TraverseFormatter, MeasurementTable
+
+
+# the traverse table holds the measured angles
+_GEOMETRY_INPUTS = frozenset(['f1', 'f2', 'l1', 'l2', 'a_start', 'a_finish',
+                              'traverse'])
+_CLOSURE_INPUTS = frozenset(['length', '_l1_temp_x', '_l1_temp_y',
+                             '_l1_temp_z'])
+
+
+class TraverseResult:
+    """
+    Read-only derived quantities of a traverse.
+
+    The geometry part (mean elevation, k, measured azimuth, angular
+    misclosure and correction) depends on the fixed points and the
+    measured angles. The closure part (wX, wY, wZ, corrections,
+    horizontal misclosure) also depends on the computed end point and the
+    length, so it is the only part rebuilt after compute().
+    """
+    GEOMETRY = ('mean_elevation', 'k', 'a_measured',
+                'angular_misclosure', 'angular_correction')
+    CLOSURE = ('wx', 'wy', 'wz', 'horizontal_misclosure',
+               'x_cor', 'y_cor', 'z_cor')
+    __slots__ = GEOMETRY + CLOSURE
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values[name])
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, item):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self) -> str:
+        return f"TraverseResult(angular={self.angular_misclosure}, " \
+               f"horizontal={self.horizontal_misclosure})"
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name in self.__slots__:
+            object.__setattr__(self, name, state[name])
+
+    @classmethod
+    def from_traverse(cls, traverse, previous=None):
+        """
+        :param traverse: Traverse
+        :param previous: TraverseResult
+            Result whose geometry part is still valid and is reused.
+        :return: TraverseResult
+        """
+
+        if previous is None:
+            values = cls._geometry(traverse)
+        else:
+            values = {name: getattr(previous, name) for name in cls.GEOMETRY}
+
+        values.update(cls._closure(traverse))
+
+        return cls(**values)
+
+    @staticmethod
+    def _geometry(t) -> dict:
+        if isinstance(t, LinkTraverse):
+            mean_elevation = round((t.f2.z + t.l1.z) / 2, 3)
+            k = round(calc_k(t.f2.x, t.l1.x), DIST_ROUND)
+        else:
+            mean_elevation = round((t.f2.z + t.f1.z) / 2, 3)
+            k = round(calc_k(t.f2.x, t.f1.x), DIST_ROUND)
+
+        a_measured = Azimuth.from_measurements(t.a_start,
+                                               t.traverse['h_angle'])
+
+        if t.a_finish:
+            angular_misclosure = round(t.a_finish.value - a_measured.value,
+                                       ANGLE_ROUND)
+        else:
+            angular_misclosure = 0.0
+
+        angular_correction = round(angular_misclosure / t.traverse.shape[0],
+                                   ANGLE_ROUND)
+
+        return {'mean_elevation': mean_elevation,
+                'k': k,
+                'a_measured': a_measured,
+                'angular_misclosure': angular_misclosure,
+                'angular_correction': angular_correction}
+
+    @staticmethod
+    def _closure(t) -> dict:
+        if isinstance(t.l1, NonePoint):
+            wx = wy = wz = 0.0
+        else:
+            wx = round(t.l1.x - t._l1_temp_x, DIST_ROUND)
+            wy = round(t.l1.y - t._l1_temp_y, DIST_ROUND)
+            wz = round(t.l1.z - t._l1_temp_z, DIST_ROUND)
+
+        def _cor(w):
+            try:
+                return round(w / t.length, DIST_ROUND)
+            except ZeroDivisionError:
+                return 0.0
+
+        return {'wx': wx,
+                'wy': wy,
+                'wz': wz,
+                'horizontal_misclosure': round(np.sqrt(wx ** 2 + wy ** 2),
+                                               DIST_ROUND),
+                'x_cor': _cor(wx),
+                'y_cor': _cor(wy),
+                'z_cor': _cor(wz)}
 
 
 class Traverse:
@@ -28,13 +142,25 @@ class Traverse:
         self._l1_temp_x = 0
         self._l1_temp_y = 0
         self._l1_temp_z = 0
-        self.data = load_data(data)
-        self.formatted = TraverseFormatter(self.pick_data()).tranform()
+        if isinstance(data, MeasurementTable):
+            self.data = data
+            self.formatted = data.format(stops)
+        else:
+            self.data = load_data(data)
+            self.formatted = TraverseFormatter(self.pick_data()).tranform()
         self.traverse = self.formatted.get_data()
         self.is_validated, self.missing = self.validate()
         self.has_mids = False
         self.mids = self._init_mids()
 
+    def __setattr__(self, key, value):
+        super().__setattr__(key, value)
+
+        if key in _GEOMETRY_INPUTS:
+            self.invalidate()
+        elif key in _CLOSURE_INPUTS:
+            self.invalidate(closure_only=True)
+
     def __repr__(self) -> str:
         msg = f"Traverse stops: {'-'.join(self.stops)}\n" \
               f"Stops count: {self.stops_count:12}\n" \
@@ -54,6 +180,9 @@ class Traverse:
         return msg
 
     def pick_data(self) -> pd.DataFrame:
+        if isinstance(self.data, MeasurementTable):
+            return self.data.pick(self.stops)
+
         _picked = self.data.loc[(self.data['bs'].isin(self.stops)) & (
             self.data['station'].isin(self.stops)) & (
                                     self.data['fs'].isin(self.stops))].copy()
@@ -76,77 +205,107 @@ class Traverse:
         working_dir = Path(file).parent
         return cls(stops, data, start, finish, working_dir)
 
+    @property
+    def result(self) -> TraverseResult:
+        """
+        Derived quantities of the traverse, computed on first access and
+        kept until one of their inputs changes.
+        """
+
+        return self._current_result()
+
+    def _current_result(self, geometry: bool = False) -> TraverseResult:
+        _result = self.__dict__.get('_result')
+        _stale = self.__dict__.get('_stale', 'all')
+
+        if geometry and _result is not None and _stale == 'closure':
+            # the geometry part of a result is still valid
+            return _result
+
+        if _result is None or _stale == 'all':
+            _result = TraverseResult.from_traverse(self)
+        elif _stale == 'closure':
+            _result = TraverseResult.from_traverse(self, _result)
+
+        self.__dict__['_result'] = _result
+        self.__dict__['_stale'] = None
+
+        return _result
+
+    def invalidate(self, closure_only: bool = False):
+        """
+        Drops the cached result. Rebinding an input attribute does this on
+        its own; call it after editing the traverse table in place.
+
+        :param closure_only: bool
+            Only the misclosures and corrections are out of date (length
+            or the computed end point changed).
+        """
+
+        if closure_only and self.__dict__.get('_stale') != 'all':
+            self.__dict__['_stale'] = 'closure'
+        else:
+            self.__dict__['_stale'] = 'all'
+
+    def _store(self, **values):
+        """
+        Writes the results of a solve. They keep the measured angles and
+        the row count of the traverse table, so the cached geometry stays
+        valid and only the closure part is rebuilt.
+        """
+
+        for key, value in values.items():
+            object.__setattr__(self, key, value)
+
+        self.invalidate(closure_only=True)
+
     @property
     def mean_elevation(self) -> float:
-        if isinstance(self, LinkTraverse):
-            return round((self.f2.z + self.l1.z) / 2, 3)
-        return round((self.f2.z + self.f1.z) / 2, 3)
+        return self._current_result(geometry=True).mean_elevation
 
     @property
     def k(self) -> float:
-        if isinstance(self, LinkTraverse):
-            return round(calc_k(self.f2.x, self.l1.x), DIST_ROUND)
-        return round(calc_k(self.f2.x, self.f1.x), DIST_ROUND)
+        return self._current_result(geometry=True).k
 
     @property
     def a_measured(self) -> Azimuth:
-        return Azimuth.from_measurements(self.a_start,
-                                         self.traverse['h_angle'])
+        return self._current_result(geometry=True).a_measured
 
     @property
     def angular_misclosure(self) -> float:
-        if self.a_finish:
-            return round(self.a_finish.value - self.a_measured.value,
-                         ANGLE_ROUND)
-        return 0.0
+        return self._current_result(geometry=True).angular_misclosure
 
     @property
     def angular_correction(self) -> float:
-        return round(self.angular_misclosure / self.traverse.shape[0],
-                     ANGLE_ROUND)
+        return self._current_result(geometry=True).angular_correction
 
     @property
     def wx(self) -> float:
-        if isinstance(self.l1, NonePoint):
-            return 0.0
-        return round(self.l1.x - self._l1_temp_x, DIST_ROUND)
+        return self.result.wx
 
     @property
     def wy(self) -> float:
-        if isinstance(self.l1, NonePoint):
-            return 0.0
-        return round(self.l1.y - self._l1_temp_y, DIST_ROUND)
+        return self.result.wy
 
     @property
     def wz(self) -> float:
-        if isinstance(self.l1, NonePoint):
-            return 0.0
-        return round(self.l1.z - self._l1_temp_z, DIST_ROUND)
+        return self.result.wz
 
     @property
     def horizontal_misclosure(self) -> float:
-        return round(np.sqrt(self.wx ** 2 + self.wy ** 2), DIST_ROUND)
+        return self.result.horizontal_misclosure
 
     @property
     def x_cor(self) -> float:
-        try:
-            return round(self.wx / self.length, DIST_ROUND)
-        except ZeroDivisionError:
-            return 0.0
+        return self.result.x_cor
 
     @property
     def y_cor(self) -> float:
-        try:
-            return round(self.wy / self.length, DIST_ROUND)
-        except ZeroDivisionError:
-            return 0.0
+        return self.result.y_cor
 
     @property
     def z_cor(self) -> float:
-        try:
-            return round(self.wz / self.length, DIST_ROUND)
-        except ZeroDivisionError:
-            return 0.0
+        return self.result.z_cor
 
     @property
     def info(self):
@@ -164,9 +323,12 @@ class Traverse:
         return out.style.format(traverse_formatter).hide_index()
 
     def validate(self) -> Tuple[bool, list]:
-        needed_angles = fmt_angle(self.stops)
-        missing = [angle for angle in needed_angles if
-                   angle not in self.formatted.angles]
+        if isinstance(self.data, MeasurementTable):
+            missing = self.data.missing_angles(self.stops)
+        else:
+            _available = set(self.formatted.angles.tolist())
+            missing = [angle for angle in fmt_angle(self.stops) if
+                       angle not in _available]
 
         if missing:
             print(
@@ -178,6 +340,17 @@ class Traverse:
             return False, missing
         return True, missing
 
+    def compute(self):
+        """
+        Solves the traverse as a batch of one, see TraverseBatch.
+        """
+
+        # batch builds on this module
+        from atsurvey.core.batch import TraverseBatch
+
+        if self.is_validated:
+            TraverseBatch([self]).compute()
+
     def export(self):
         file_to_export = self.traverse.copy()
 
@@ -217,61 +390,6 @@ class OpenTraverse(Traverse):
                          working_dir=working_dir)
         self.stops_count = len(stops) - 1
 
-    def compute(self):
-        if self.is_validated:
-            h_angle = Angles(self.traverse['h_angle'])
-            dz_temp = DeltaDistances(self.traverse['dz_temp'])
-            h_dist = HorizontalDistances(self.traverse['h_dist'])
-            dz_temp[-1] = np.nan
-            h_dist[-1] = np.nan
-            ref_dist = h_dist.to_reference(self.mean_elevation)
-            egsa_dist = ref_dist.to_egsa(self.k)
-            self.length = egsa_dist.sum()
-
-            azimuths = Azimuths(h_angle).for_traverse(self.a_start)
-            dx_temp = DeltaDistances(egsa_dist * azimuths.sin)
-            dy_temp = DeltaDistances(egsa_dist * azimuths.cos)
-            dx = dx_temp
-            dy = dy_temp
-            dz = dz_temp
-            stations = Points.from_traverse(self.f2, self.f2, dx, dy, dz)
-
-            self.traverse['surf_dist'] = ref_dist.values
-            self.traverse['egsa_dist'] = egsa_dist.values
-            self.traverse['azimuth'] = azimuths.values
-            self.traverse['dX'] = dx.values
-            self.traverse['dY'] = dy.values
-            self.traverse['dZ'] = dz.values
-            self.traverse['X'] = stations.x
-            self.traverse['Y'] = stations.y
-            self.traverse['Z'] = stations.z
-
-            if self.has_mids:
-                keep = ['mid', 'bs', 'station', 'fs',
-                        'h_dist', 'surf_dist', 'egsa_dist',
-                        'h_angle', 'azimuth',
-                        'dX', 'dY', 'dZ', 'X', 'Y', 'Z']
-            else:
-                keep = ['bs', 'station', 'fs',
-                        'h_dist', 'surf_dist', 'egsa_dist',
-                        'h_angle', 'azimuth',
-                        'dX', 'dY', 'dZ', 'X', 'Y', 'Z']
-
-            self.traverse = self.traverse[keep]
-
-            self.metrics = pd.DataFrame.from_dict(
-                {'traverse': [self.name],
-                 'stations': [self.stops_count],
-                 'length': [self.length],
-                 'mean_elev': [self.mean_elevation],
-                 'angular': [np.nan],
-                 'horizontal': [np.nan],
-                 'wx': [np.nan],
-                 'wy': [np.nan],
-                 'wz': [np.nan]}, orient='index')
-
-            self.stations = Container(self.traverse[['station', 'X', 'Y', 'Z']])
-
 
 class LinkTraverse(Traverse):
     def __init__(self, stops: list,
@@ -286,65 +404,6 @@ class LinkTraverse(Traverse):
                          working_dir=working_dir)
         self.stops_count = len(stops) - 2
 
-    def compute(self):
-        if self.is_validated:
-            h_angle = Angles(self.traverse['h_angle'])
-            dz_temp = DeltaDistances(self.traverse['dz_temp'])
-            h_dist = HorizontalDistances(self.traverse['h_dist'])
-            dz_temp[-1] = np.nan
-            h_dist[-1] = np.nan
-            ref_dist = h_dist.to_reference(self.mean_elevation)
-            egsa_dist = ref_dist.to_egsa(self.k)
-            self.length = egsa_dist.sum()
-            h_angle_fixed = h_angle + self.angular_correction
-            azimuths = Azimuths(h_angle_fixed).for_traverse(self.a_start)
-            dx_temp = DeltaDistances(egsa_dist * azimuths.sin)
-            dy_temp = DeltaDistances(egsa_dist * azimuths.cos)
-            self._l1_temp_x = self.f2.x + dx_temp.sum()
-            self._l1_temp_y = self.f2.y + dy_temp.sum()
-            self._l1_temp_z = self.f2.z + dz_temp.sum()
-            dx = DeltaDistances(dx_temp + self.x_cor * egsa_dist)
-            dy = DeltaDistances(dy_temp + self.y_cor * egsa_dist)
-            dz = DeltaDistances(dz_temp + self.z_cor * egsa_dist)
-            stations = Points.from_traverse(self.f2, self.l1, dx, dy, dz)
-
-            self.traverse['surf_dist'] = ref_dist.values
-            self.traverse['egsa_dist'] = egsa_dist.values
-            self.traverse['h_angle_fixed'] = h_angle_fixed.values
-            self.traverse['azimuth'] = azimuths.values
-            self.traverse['dX'] = dx.values
-            self.traverse['dY'] = dy.values
-            self.traverse['dZ'] = dz.values
-            self.traverse['X'] = stations.x
-            self.traverse['Y'] = stations.y
-            self.traverse['Z'] = stations.z
-
-            if self.has_mids:
-                keep = ['mid', 'bs', 'station', 'fs',
-                        'h_dist', 'surf_dist', 'egsa_dist',
-                        'h_angle', 'h_angle_fixed', 'azimuth',
-                        'dX', 'dY', 'dZ', 'X', 'Y', 'Z']
-            else:
-                keep = ['bs', 'station', 'fs',
-                        'h_dist', 'surf_dist', 'egsa_dist',
-                        'h_angle', 'h_angle_fixed', 'azimuth',
-                        'dX', 'dY', 'dZ', 'X', 'Y', 'Z']
-
-            self.traverse = self.traverse[keep]
-
-            self.metrics = pd.DataFrame.from_dict(
-                {'traverse': [self.name],
-                 'stations': [self.stops_count],
-                 'length': [self.length],
-                 'mean_elev': [self.mean_elevation],
-                 'angular': [self.angular_misclosure],
-                 'horizontal': [self.horizontal_misclosure],
-                 'wx': [self.wx],
-                 'wy': [self.wy],
-                 'wz': [self.wz]})
-
-            self.stations = Container(self.traverse[['station', 'X', 'Y', 'Z']])
-
 
 class ClosedTraverse(Traverse):
     def __init__(self, stops: list,
@@ -377,61 +436,26 @@ class ClosedTraverse(Traverse):
 
         return msg
 
-    def compute(self):
-        if self.is_validated:
-            h_angle = Angles(self.traverse['h_angle'])
-            dz_temp = DeltaDistances(self.traverse['dz_temp'])
-            h_dist = HorizontalDistances(self.traverse['h_dist'])
-            dz_temp[-1] = np.nan
-            h_dist[-1] = np.nan
-            ref_dist = h_dist.to_reference(self.mean_elevation)
-            egsa_dist = ref_dist.to_egsa(self.k)
-            self.length = egsa_dist.sum()
-            h_angle_fixed = h_angle + self.angular_correction
-            azimuths = Azimuths(h_angle_fixed).for_traverse(self.a_start)
-            dx_temp = DeltaDistances(egsa_dist * azimuths.sin)
-            dy_temp = DeltaDistances(egsa_dist * azimuths.cos)
-            self._l1_temp_x = self.f2.x + dx_temp.sum()
-            self._l1_temp_y = self.f2.y + dy_temp.sum()
-            self._l1_temp_z = self.f2.z + dz_temp.sum()
-            dx = DeltaDistances(dx_temp + self.x_cor * egsa_dist)
-            dy = DeltaDistances(dy_temp + self.y_cor * egsa_dist)
-            dz = DeltaDistances(dz_temp + self.z_cor * egsa_dist)
-            stations = Points.from_traverse(self.f2, self.f2, dx, dy, dz)
-
-            self.traverse['surf_dist'] = ref_dist.values
-            self.traverse['egsa_dist'] = egsa_dist.values
-            self.traverse['h_angle_fixed'] = h_angle_fixed.values
-            self.traverse['azimuth'] = azimuths.values
-            self.traverse['dX'] = dx.values
-            self.traverse['dY'] = dy.values
-            self.traverse['dZ'] = dz.values
-            self.traverse['X'] = stations.x
-            self.traverse['Y'] = stations.y
-            self.traverse['Z'] = stations.z
-
-            if self.has_mids:
-                keep = ['mid', 'bs', 'station', 'fs',
-                        'h_dist', 'surf_dist', 'egsa_dist',
-                        'h_angle', 'h_angle_fixed', 'azimuth',
-                        'dX', 'dY', 'dZ', 'X', 'Y', 'Z']
-            else:
-                keep = ['bs', 'station', 'fs',
-                        'h_dist', 'surf_dist', 'egsa_dist',
-                        'h_angle', 'h_angle_fixed', 'azimuth',
-                        'dX', 'dY', 'dZ', 'X', 'Y', 'Z']
-
-            self.traverse = self.traverse[keep]
-
-            self.metrics = pd.DataFrame.from_dict(
-                {'traverse': [self.name],
-                 'stations': [self.stops_count],
-                 'length': [self.length],
-                 'mean_elev': [self.mean_elevation],
-                 'angular': [self.angular_misclosure],
-                 'horizontal': [self.horizontal_misclosure],
-                 'wx': [self.wx],
-                 'wy': [self.wy],
-                 'wz': [self.wz]}, orient='index')
-
-            self.stations = Container(self.traverse[['station', 'X', 'Y', 'Z']])
+
+TRAVERSE_TYPES = {'LinkTraverse': LinkTraverse,
+                  'ClosedTraverse': ClosedTraverse,
+                  'OpenTraverse': OpenTraverse}
+
+
+def make_traverse(t_type: str,
+                  stops: list,
+                  data: Any,
+                  start: List[Point],
+                  finish: List[Point] = None,
+                  working_dir: Union[str, Path] = None) -> Traverse:
+    """
+    Traverse of the given type name, unknown types are computed as open
+    traverses. Only link traverses use the finish points.
+    """
+
+    _cls = TRAVERSE_TYPES.get(t_type, OpenTraverse)
+
+    if _cls is LinkTraverse:
+        return _cls(stops=stops, data=data, start=start, finish=finish,
+                    working_dir=working_dir)
+    return _cls(stops=stops, data=data, start=start, working_dir=working_dir)
@@ -3,9 +3,11 @@ from atsurvey.util import *
 
 
 class Angle:
+    __slots__ = ['_angleG', '_angleR']
+
     def __init__(self, angle):
-        self._angleG = resolve_angle(angle)
-        self._angleR = grad2rad(self._angleG)
+        self._angleG = resolve_grad(getattr(angle, "value", angle))
+        self._angleR = None
 
     def __repr__(self):
         return f"Angle({self._angleG:.4f})"
@@ -95,6 +97,8 @@ class Angle:
 
     @property
     def rad(self) -> Union[float, int]:
+        if self._angleR is None:
+            self._angleR = grad2rad(self._angleG)
         return self._angleR
 
     @property
@@ -103,11 +107,11 @@ class Angle:
 
     @property
     def cos(self) -> Union[float, int]:
-        return round(np.cos(self._angleR), ANGLE_ROUND)
+        return round(np.cos(self.rad), ANGLE_ROUND)
 
     @property
     def sin(self) -> Union[float, int]:
-        return round(np.sin(self._angleR), ANGLE_ROUND)
+        return round(np.sin(self.rad), ANGLE_ROUND)
 
     @property
     def reverse(self) -> Union[float, int]:
@@ -120,7 +124,9 @@ class Angle:
 class Angles:
     def __init__(self, angles):
         self._anglesG: np.ndarray = resolve_angle(self._load(angles))
-        self._anglesR: np.ndarray = grad2rad(self._anglesG)
+        self._anglesR: Union[np.ndarray, None] = None
+        self._sin: Union[np.ndarray, None] = None
+        self._cos: Union[np.ndarray, None] = None
 
     def __repr__(self):
         return f"Angles({self._anglesG.round(4)})"
@@ -173,9 +179,32 @@ class Angles:
     def __setitem__(self, key, value):
         try:
             self._anglesG[key] = value
-            self._anglesR = grad2rad(self._anglesG)
         except IndexError:
             print(f"  -IndexError- Last index: {len(self) - 1}")
+        else:
+            self._refresh(key)
+
+    def _refresh(self, key):
+        """
+        Recomputes the cached radians and trig values of the written
+        elements only.
+        """
+
+        if self._anglesR is None:
+            return
+
+        self._anglesR[key] = grad2rad(np.atleast_1d(self._anglesG[key]))
+
+        if self._sin is not None:
+            self._sin[key] = np.sin(self._anglesR[key]).round(ANGLE_ROUND)
+        if self._cos is not None:
+            self._cos[key] = np.cos(self._anglesR[key]).round(ANGLE_ROUND)
+
+    @staticmethod
+    def _readonly(values: np.ndarray) -> np.ndarray:
+        _view = values.view()
+        _view.flags.writeable = False
+        return _view
 
     @staticmethod
     def _load(angles):
@@ -187,7 +216,9 @@ class Angles:
 
     @property
     def rad(self) -> np.ndarray:
-        return self._anglesR
+        if self._anglesR is None:
+            self._anglesR = grad2rad(self._anglesG)
+        return self._readonly(self._anglesR)
 
     @property
     def grad(self) -> np.ndarray:
@@ -195,11 +226,15 @@ class Angles:
 
     @property
     def cos(self) -> np.ndarray:
-        return np.cos(self._anglesR).round(ANGLE_ROUND)
+        if self._cos is None:
+            self._cos = np.cos(self.rad).round(ANGLE_ROUND)
+        return self._readonly(self._cos)
 
     @property
     def sin(self) -> np.ndarray:
-        return np.sin(self._anglesR).round(ANGLE_ROUND)
+        if self._sin is None:
+            self._sin = np.sin(self.rad).round(ANGLE_ROUND)
+        return self._readonly(self._sin)
 
     def sum(self) -> Union[float, int]:
         return round(np.nansum(self._anglesG), ANGLE_ROUND)
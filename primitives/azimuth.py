@@ -3,6 +3,8 @@ from atsurvey.primitives.angle import *
 
 
 class Azimuth(Angle):
+    __slots__ = ()
+
     def __init__(self, angle):
         super().__init__(angle)
 
@@ -10,30 +12,21 @@ class Azimuth(Angle):
         return f"Azimuth({self._angleG:.4f})"
 
     @classmethod
-    @vectorize
-    def from_tuples(cls, a, b, reverse=False):
-        dx = b[0] - a[0]
-        dy = b[1] - a[1]
-
-        _azimuth = Angle(determine_quartile(dx, dy))
+    def from_delta(cls, dx, dy, reverse=False):
+        _azimuth = resolve_angle(determine_quartile(dx, dy))
 
         if reverse:
-            return cls(_azimuth.reverse)
+            return cls(round(400 - _azimuth, ANGLE_ROUND))
         else:
-            return cls(_azimuth.value)
+            return cls(_azimuth)
 
     @classmethod
-    @vectorize
-    def from_points(cls, a, b, reverse=False):
-        dx = b.x - a.x
-        dy = b.y - a.y
-
-        _azimuth = Angle(determine_quartile(dx, dy))
+    def from_tuples(cls, a, b, reverse=False):
+        return cls.from_delta(b[0] - a[0], b[1] - a[1], reverse)
 
-        if reverse:
-            return cls(_azimuth.reverse)
-        else:
-            return cls(_azimuth.value)
+    @classmethod
+    def from_points(cls, a, b, reverse=False):
+        return cls.from_delta(b.x - a.x, b.y - a.y, reverse)
 
     @classmethod
     def from_measurements(cls, a_start, measurements):
@@ -62,28 +55,52 @@ class Azimuths(Angles):
         return f"Azimuths({self._anglesG.round(4)})"
 
     @classmethod
-    def from_tuples(cls, a, b, reverse=False):
-        dx = np.array([i[0] for i in b]) - np.array([i[0] for i in a])
-        dy = np.array([i[1] for i in b]) - np.array([i[1] for i in a])
-
-        _azimuth = Angles(determine_quartile(dx, dy))
+    def from_coordinates(cls, x1, y1, x2, y2, reverse=False):
+        """
+        Azimuths from the coordinate arrays of the start (x1, y1) and end
+        (x2, y2) points, computed in one vectorized pass.
+
+        :param x1: Any
+            X of the start points (array, Series or scalar).
+        :param y1: Any
+            Y of the start points.
+        :param x2: Any
+            X of the end points.
+        :param y2: Any
+            Y of the end points.
+        :param reverse: bool
+            Return the azimuths of the opposite directions (end -> start).
+        :return: Azimuths
+        """
+
+        dx = val2array(x2) - val2array(x1)
+        dy = val2array(y2) - val2array(y1)
+
+        _azimuth = resolve_angle(determine_quartile(as_array(dx),
+                                                    as_array(dy)))
 
         if reverse:
-            return cls(_azimuth.reverse)
+            return cls((400 - _azimuth).round(ANGLE_ROUND))
         else:
-            return cls(_azimuth.values)
+            return cls(_azimuth)
 
     @classmethod
-    def from_points(cls, a, b, reverse=False):
-        dx = np.array([i.x for i in b]) - np.array([i.x for i in a])
-        dy = np.array([i.y for i in b]) - np.array([i.y for i in a])
+    def from_tuples(cls, a, b, reverse=False):
+        _a = np.asarray(a, dtype=float)
+        _b = np.asarray(b, dtype=float)
 
-        _azimuth = Angles(determine_quartile(dx, dy))
+        return cls.from_coordinates(_a[:, 0], _a[:, 1],
+                                    _b[:, 0], _b[:, 1],
+                                    reverse)
 
-        if reverse:
-            return cls(_azimuth.reverse)
-        else:
-            return cls(_azimuth.values)
+    @classmethod
+    def from_points(cls, a, b, reverse=False):
+        if isinstance(getattr(a, 'x', None), np.ndarray):
+            return cls.from_coordinates(a.x, a.y, b.x, b.y, reverse)
+
+        return cls.from_coordinates([i.x for i in a], [i.y for i in a],
+                                    [i.x for i in b], [i.y for i in b],
+                                    reverse)
 
     @classmethod
     def from_measurements(cls, a_start, measurements):
@@ -102,9 +119,21 @@ class Azimuths(Angles):
         return cls(_azimuth)
 
     def for_traverse(self, a_start):
-        _azimuths = [a_start]
-        for idx, angle in enumerate(self._anglesG):
-            _azimuth = Angle(_azimuths[idx] + angle + 200)
-            _azimuths.append(_azimuth)
+        return Azimuths(propagate_azimuths(a_start, self._anglesG))
 
-        return Azimuths(_azimuths[1:])
+    @classmethod
+    def for_traverses(cls, a_starts, angles, offsets):
+        """
+        Azimuths of many traverses in one call.
+
+        :param a_starts: Any
+            Starting azimuth of each traverse.
+        :param angles: Any
+            Horizontal angles of all traverses, back to back.
+        :param offsets: Any
+            Segment boundaries in 'angles' (n_traverses + 1 values).
+        :return: Azimuths
+            Flat azimuths aligned with 'angles'.
+        """
+
+        return cls(propagate_azimuths(a_starts, angles, offsets))
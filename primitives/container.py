@@ -1,67 +1,51 @@
 # -*- coding: utf-8 -*-
 
-from atsurvey.primitives.point import *
-from typing import Tuple
+from atsurvey.primitives.pointset import *
+from atsurvey.primitives.spatial import GridIndex, cluster_points
+from typing import Tuple, Iterator
 
 
-# noinspection PyTypeChecker
-def transform_split(data: Union[str, pd.DataFrame, None]) \
-        -> Tuple[pd.DataFrame, pd.Series]:
+def load_points(data: Union[str, Path, pd.DataFrame, PointSet, None]) \
+        -> PointSet:
     if data is None:
-        df = pd.DataFrame(columns=['station', 'X', 'Y', 'Z'])
+        return PointSet()
+    elif isinstance(data, PointSet):
+        return data
+    elif isinstance(data, (str, Path)):
+        return PointSet.from_frame(pd.read_excel(data))
     else:
-        if isinstance(data, (str, Path)):
-            df = pd.read_excel(data)
-        else:
-            df = data.copy()
-
-    if df.index.name == 'station':
-        df.reset_index(inplace=True)
-
-    if not df.empty:
-        df['obj'] = df.apply(lambda p: Point(p['station'],
-                                             p['X'],
-                                             p['Y'],
-                                             p['Z']), axis=1)
-    else:
-        df['obj'] = np.nan
-
-    df.set_index('station', drop=True, inplace=True)
-    s = df['obj'].copy(deep=True)
-
-    return df, s
+        return PointSet.from_frame(data)
 
 
 class Container:
-    def __init__(self, data: Union[str, pd.DataFrame, None] = None):
-        self._data, self._series = transform_split(data)
+    def __init__(self,
+                 data: Union[str, pd.DataFrame, PointSet, None] = None):
+        self._points = load_points(data)
+        self.conflicts = []
+        self._index = None
+        self._bounds = None
 
     def __len__(self) -> int:
-        return self._data.shape[0]
+        return len(self._points)
 
     def __getitem__(self, key: str) -> Union[Point, NonePoint]:
         try:
-            return self._series[key]
+            return self._points[key]
         except KeyError:
             print(f"\n[ERROR] - Point doesn't exist: [{key}]\n")
             return NonePoint()
 
     def __setitem__(self, key: str, value: Point):
-        self._series[key] = value
+        self._points.set(value.copy(name=key))
+        self._reset_cache()
 
     def __contains__(self, item: Union[str, list, tuple]) -> bool:
-        if isinstance(item, str):
-            return item in self._data.index
-        elif isinstance(item, (list, tuple)):
-            return all([i in self._data.index for i in item])
+        if isinstance(item, (list, tuple)):
+            return all([i in self._points for i in item])
+        return item in self._points
 
     def __add__(self, other):
-        _original = self._data.copy(deep=True).reset_index()
-        _new = other.data.reset_index()
-
-        _final = _original.append(_new).drop_duplicates(subset='station')
-
-        return Container(_final)
+        return Container.concat([self, other])
 
     def __radd__(self, other):
         if other == 0:
@@ -70,38 +54,180 @@ class Container:
             return self.__add__(other)
 
     def __iter__(self):
-        return iter(self._series)
+        return iter(self._points)
+
+    @classmethod
+    def concat(cls,
+               containers: Iterator,
+               duplicates: str = 'first',
+               tolerance: float = 0.001,
+               radius: float = None,
+               rank: Any = None):
+        """
+        Merges any number of containers in one pass.
+
+        :param containers: Iterator
+            Containers to merge, earlier containers take precedence with
+            the 'first' policy.
+        :param duplicates: str
+            'first', 'last', 'average', 'best' or 'raise' (see
+            PointSet.merge).
+        :param tolerance: float
+            Coordinate spread above which a repeated point ID is reported
+            as a conflict.
+        :param radius: float
+            Also merge points with different IDs within 'radius' of each
+            other (see PointSet.merge).
+        :param rank: Any
+            Quality of every point of the containers, lower is better, for
+            the 'best' policy.
+        :return: Container
+            Merged container, the conflicting point IDs are kept in its
+            'conflicts' attribute.
+        """
+
+        _merged, _conflicts = PointSet.merge(
+            [c.pointset for c in containers],
+            duplicates=duplicates,
+            tolerance=tolerance,
+            radius=radius,
+            rank=rank)
+
+        _container = cls(_merged)
+        _container.conflicts = _conflicts
+
+        return _container
 
     @property
     def empty(self) -> bool:
-        return self.data.empty
+        return len(self._points) == 0
+
+    @property
+    def pointset(self) -> PointSet:
+        return self._points
 
     @property
     def data(self) -> pd.DataFrame:
-        keep = ['X', 'Y', 'Z']
-        return self._data[keep].copy()
+        return self._points.to_frame()
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        if self._bounds is None:
+            self._bounds = (np.nanmin(self._points.x),
+                            np.nanmin(self._points.y),
+                            np.nanmax(self._points.x),
+                            np.nanmax(self._points.y))
+
+        return self._bounds
 
     @property
     def boundaries(self) -> Tuple[int, int, int, int]:
-        xmin = int(np.floor(self.data['X'].min()))
-        ymin = int(np.floor(self.data['Y'].min()))
-        xmax = int(np.ceil(self.data['X'].max()))
-        ymax = int(np.ceil(self.data['Y'].max()))
+        _xmin, _ymin, _xmax, _ymax = self.bounds
+
+        xmin = int(np.floor(_xmin))
+        ymin = int(np.floor(_ymin))
+        xmax = int(np.ceil(_xmax))
+        ymax = int(np.ceil(_ymax))
 
         return xmin, ymin, xmax, ymax
 
+    @property
+    def spatial_index(self) -> GridIndex:
+        if self._index is None:
+            self._index = GridIndex(self._points.x, self._points.y)
+
+        return self._index
+
+    def _reset_cache(self):
+        self._index = None
+        self._bounds = None
+
+    def nearest(self, x: float, y: float, k: int = 1):
+        """
+        The k points nearest to (x, y), nearest first.
+        """
+
+        _rows, _ = self.spatial_index.nearest(x, y, k)
+
+        return Container(self._points.take(_rows))
+
+    def within(self, x: float, y: float, r: float):
+        """
+        Points within distance r of (x, y), nearest first.
+        """
+
+        _rows, _ = self.spatial_index.within(x, y, r)
+
+        return Container(self._points.take(_rows))
+
+    def in_bbox(self, xmin: float, ymin: float, xmax: float, ymax: float):
+        """
+        Points inside the bounding box, in container order.
+        """
+
+        _rows = np.sort(self.spatial_index.in_bbox(xmin, ymin, xmax, ymax))
+
+        return Container(self._points.take(_rows))
+
+    def coincident(self, radius: float = 0.01) -> pd.DataFrame:
+        """
+        Points with different IDs within 'radius' of each other (see
+        cluster_points), one row per point.
+
+        :param radius: float
+            Largest horizontal distance between points of a cluster.
+        :return: pd.DataFrame
+            cluster, station, X, Y, Z and distance from the cluster mean,
+            clusters numbered from 1 in order of first appearance.
+        """
+
+        _p = self._points
+        _clusters = cluster_points(_p.x, _p.y, radius)
+
+        # clusters holding more than one name
+        _mixed = pd.Series(_p.names, dtype=object).groupby(
+            _clusters).transform('nunique').values > 1
+        _rows = np.flatnonzero(_mixed)
+
+        report = pd.DataFrame({'cluster': _clusters[_rows],
+                               'station': _p.names[_rows],
+                               'X': _p.x[_rows],
+                               'Y': _p.y[_rows],
+                               'Z': _p.z[_rows]})
+        report['cluster'] = pd.factorize(report['cluster'])[0] + 1
+        _mean = report.groupby('cluster')[['X', 'Y']].transform('mean')
+        report['dist'] = np.hypot(report['X'] - _mean['X'],
+                                  report['Y'] - _mean['Y'])
+
+        return report
+
     def sort(self):
-        self._data, self._series = transform_split(self._data.sort_index())
+        self._points = self._points.sort()
+        self._reset_cache()
 
         return self
 
     def update(self, other: pd.DataFrame):
-        _original = self._data.copy(deep=True).reset_index()
-        _new = other.copy().reset_index()
+        _new = load_points(other)
+        _old_count = len(self._points)
+
+        if not self._points.is_unique:
+            self._reset_cache()
+
+        self._points, self.conflicts = PointSet.merge([self._points, _new])
+
+        # merging keeps unique existing rows in place and appends new names
+        _rows = np.arange(_old_count, len(self._points))
+        _x, _y = self._points.x[_rows], self._points.y[_rows]
 
-        _final = _original.append(_new).drop_duplicates(subset='station')
+        if self._index is not None:
+            self._index.insert(_x, _y, _rows)
 
-        self._data, self._series = transform_split(_final)
+        if self._bounds is not None and _rows.size:
+            self._bounds = (np.nanmin(np.append(_x, self._bounds[0])),
+                            np.nanmin(np.append(_y, self._bounds[1])),
+                            np.nanmax(np.append(_x, self._bounds[2])),
+                            np.nanmax(np.append(_y, self._bounds[3])))
 
         return self
 
@@ -3,6 +3,8 @@ from atsurvey.primitives.angle import *
 
 
 class Distance:
+    __slots__ = ['_distance']
+
     def __init__(self, distance):
         self._distance = distance
 
@@ -95,19 +97,19 @@ class Distance:
 
 
 class SlopeDistance(Distance):
+    __slots__ = ()
+
     def __init__(self, distance):
         super().__init__(distance)
 
     def __repr__(self):
         return f"SlopeDistance({self._distance:.4f})"
 
-    @vectorize
-    def to_horizontal(self, vangles):
-        _horizontal = slope2hor(self._distance, vangles.values)
+    def to_horizontal(self, vangle):
+        _horizontal = slope2hor(self._distance, instance2val(vangle))
 
         return HorizontalDistance(_horizontal)
 
-    @vectorize
     def to_delta(self, vangle: Angle, sh, th):
         _delta = p2p_dh(self._distance,
                         vangle.value,
@@ -118,13 +120,14 @@ class SlopeDistance(Distance):
 
 
 class HorizontalDistance(Distance):
+    __slots__ = ()
+
     def __init__(self, distance):
         super().__init__(distance)
 
     def __repr__(self):
         return f"HorizontalDistance({self._distance:.4f})"
 
-    @vectorize
     def to_reference(self, elevation):
         _reference = hor2ref(self._distance, elevation)
 
@@ -132,13 +135,14 @@ class HorizontalDistance(Distance):
 
 
 class ReferenceDistance(Distance):
+    __slots__ = ()
+
     def __init__(self, distance):
         super().__init__(distance)
 
     def __repr__(self):
         return f"ReferenceDistance({self._distance:.4f})"
 
-    @vectorize
     def to_egsa(self, k):
         _egsa = ref2egsa(self._distance, k)
 
@@ -146,6 +150,8 @@ class ReferenceDistance(Distance):
 
 
 class EGSADistance(Distance):
+    __slots__ = ()
+
     def __init__(self, distances):
         super().__init__(distances)
 
@@ -161,6 +167,8 @@ class EGSADistance(Distance):
 
 
 class DeltaDistance(Distance):
+    __slots__ = ()
+
     def __init__(self, distance):
         super().__init__(distance)
 
@@ -168,7 +176,49 @@ class DeltaDistance(Distance):
         return f"DeltaDistance({self._distance:.4f})"
 
 
+def _op_horizontal(rad: np.ndarray):
+    def op(buffer: np.ndarray) -> np.ndarray:
+        buffer *= np.sin(rad)
+        return round_fast(buffer, DIST_ROUND, out=buffer)
+
+    return op
+
+
+def _op_delta(rad: np.ndarray, uo: Any, us: Any):
+    def op(buffer: np.ndarray) -> np.ndarray:
+        buffer *= np.cos(rad)
+        buffer += uo
+        buffer -= us
+        return round_fast(buffer, DIST_ROUND, out=buffer)
+
+    return op
+
+
+def _op_scale(factor: Any):
+    # numpy scalars promote the product and round like np.round
+    _round = round_fast if isinstance(factor, np.generic) else round_exact
+
+    def op(buffer: np.ndarray) -> np.ndarray:
+        buffer *= factor
+        return _round(buffer, DIST_ROUND, out=buffer)
+
+    return op
+
+
+def _rad(vangles: Any) -> np.ndarray:
+    if isinstance(vangles, Angles):
+        return vangles.rad
+    return grad2rad(as_array(val2array(vangles)))
+
+
 class Distances:
+    """
+    Array of distances.
+
+    Each reduction (to_horizontal, to_reference, to_egsa, to_delta) copies
+    the distances once and runs in place on that copy.
+    """
+
     def __init__(self, distances):
         self._distances = self._load(distances)
 
@@ -234,6 +284,9 @@ class Distances:
     def _load(distances):
         return val2array(distances)
 
+    def _derive(self, cls, op):
+        return cls(op(np.array(self._distances, dtype=float)))
+
     def sum(self) -> Union[float, int]:
         return round(np.nansum(self._distances), DIST_ROUND)
 
@@ -246,17 +299,13 @@ class SlopeDistances(Distances):
         return f"SlopeDistances({self._distances.round(4)})"
 
     def to_horizontal(self, vangles):
-        _horizontal = slope2hor(self._distances, vangles.values)
-
-        return HorizontalDistances(_horizontal)
+        return self._derive(HorizontalDistances, _op_horizontal(_rad(vangles)))
 
     def to_delta(self, vangles: Angles, sh, th):
-        _delta = p2p_dh(self._distances,
-                        vangles.values,
-                        self._load(sh),
-                        self._load(th))
-
-        return DeltaDistances(_delta)
+        return self._derive(DeltaDistances,
+                            _op_delta(_rad(vangles),
+                                      as_array(self._load(sh)),
+                                      as_array(self._load(th))))
 
 
 class HorizontalDistances(Distances):
@@ -267,9 +316,10 @@ class HorizontalDistances(Distances):
         return f"HorizontalDistances({self._distances.round(4)})"
 
     def to_reference(self, elevation):
-        _reference = hor2ref(self._distances, elevation)
+        _elevation = as_array(elevation)
 
-        return ReferenceDistances(_reference)
+        return self._derive(ReferenceDistances,
+                            _op_scale(EARTH_C / (EARTH_C + _elevation)))
 
 
 class ReferenceDistances(Distances):
@@ -280,9 +330,7 @@ class ReferenceDistances(Distances):
         return f"ReferenceDistances({self._distances.round(4)})"
 
     def to_egsa(self, k):
-        _egsa = ref2egsa(self._distances, k)
-
-        return EGSADistances(_egsa)
+        return self._derive(EGSADistances, _op_scale(as_array(k)))
 
 
 class EGSADistances(Distances):
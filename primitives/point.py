@@ -57,30 +57,101 @@ class Points:
     def _load(coordinates: Any) -> np.ndarray:
         return val2array(coordinates)
 
+    def __len__(self) -> int:
+        return self.x.size
+
+    @staticmethod
+    def _coordinates(points: Any) -> Tuple[np.ndarray, ...]:
+        if isinstance(points, Point):
+            return (np.array([points.x], dtype=float),
+                    np.array([points.y], dtype=float),
+                    np.array([points.z], dtype=float))
+        elif isinstance(getattr(points, 'x', None), np.ndarray):
+            return (as_array(points.x),
+                    as_array(points.y),
+                    as_array(points.z))
+        else:
+            return (np.array([p.x for p in points], dtype=float),
+                    np.array([p.y for p in points], dtype=float),
+                    np.array([p.z for p in points], dtype=float))
+
+    @staticmethod
+    def _accumulate(starts: np.ndarray,
+                    finishes: np.ndarray,
+                    deltas: np.ndarray,
+                    offsets: np.ndarray) -> np.ndarray:
+        """
+        Running sum of the deltas of each segment, starting at its start
+        value and closing its last row on the finish value.
+
+        Segments are laid out as rows of a zero-padded grid, so a single
+        cumsum along the rows keeps the left-to-right addition order of
+        stepping through the traverse one leg at a time.
+        """
+
+        _lengths = np.diff(offsets)
+        _rows = np.repeat(np.arange(_lengths.size), _lengths)
+        _cols = np.arange(deltas.size) - np.repeat(offsets[:-1], _lengths)
+
+        _grid = np.zeros((_lengths.size, max(_lengths.max(initial=0), 1)))
+        _grid[:, 0] = starts
+
+        _legs = _cols < np.repeat(_lengths - 1, _lengths)
+        _grid[_rows[_legs], _cols[_legs] + 1] = deltas[_legs]
+
+        _values = np.cumsum(_grid, axis=1)[_rows, _cols]
+
+        _closed = _lengths > 0
+        _values[offsets[1:][_closed] - 1] = finishes[_closed]
+
+        return _values
+
     @classmethod
     def from_traverse(cls,
-                      start: Point,
-                      finish: Point,
+                      start: Any,
+                      finish: Any,
                       dx: DeltaDistances,
                       dy: DeltaDistances,
-                      dz: DeltaDistances):
-        _x: list = [start.x]
-        _y: list = [start.y]
-        _z: list = [start.z]
-
-        for idx, values in enumerate(zip(dx.values, dy.values, dz.values)):
-            new_x = _x[idx] + values[0]
-            new_y = _y[idx] + values[1]
-            new_z = _z[idx] + values[2]
-            _x.append(new_x)
-            _y.append(new_y)
-            _z.append(new_z)
-
-        _x[-2] = finish.x
-        _y[-2] = finish.y
-        _z[-2] = finish.z
-
-        return cls(_x[:-1], _y[:-1], _z[:-1])
+                      dz: DeltaDistances,
+                      offsets: Any = None):
+        """
+        Station coordinates of one or many traverses from their coordinate
+        differences.
+
+        :param start: Any
+            Start Point, or the start points of all traverses (Points or a
+            sequence of Point) when 'offsets' is given.
+        :param finish: Any
+            Finish Point(s), the last station of each traverse is closed on
+            it.
+        :param dx: DeltaDistances
+            dX of every leg (stacked for many traverses).
+        :param dy: DeltaDistances
+            dY of every leg.
+        :param dz: DeltaDistances
+            dZ of every leg.
+        :param offsets: Any
+            Segment boundaries of the traverses in dx/dy/dz, n_traverses + 1
+            values starting with 0. None means a single traverse.
+        :return: Points
+            Stations aligned with the dx/dy/dz rows.
+        """
+
+        _dx = as_array(val2array(dx))
+        _dy = as_array(val2array(dy))
+        _dz = as_array(val2array(dz))
+
+        if offsets is None:
+            _offsets = np.array([0, _dx.size])
+        else:
+            _offsets = np.asarray(offsets, dtype=np.int64)
+
+        _sx, _sy, _sz = cls._coordinates(start)
+        _fx, _fy, _fz = cls._coordinates(finish)
+
+        return cls(cls._accumulate(_sx, _fx, _dx, _offsets),
+                   cls._accumulate(_sy, _fy, _dy, _offsets),
+                   cls._accumulate(_sz, _fz, _dz, _offsets))
 
 
 class NonePoint(Point):
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+from atsurvey.primitives.point import *
+from atsurvey.primitives.spatial import cluster_points
+from typing import Iterator, List
+
+DUPLICATE_POLICIES = ('first', 'last', 'average', 'best', 'raise')
+
+
+class PointSet:
+    """
+    Columnar point store: contiguous name/X/Y/Z arrays plus a name -> row
+    hash index. Point objects are only created when rows are read.
+    """
+    __slots__ = ['names', 'x', 'y', 'z', '_index']
+
+    def __init__(self,
+                 names: Any = (),
+                 x: Any = (),
+                 y: Any = (),
+                 z: Any = ()):
+        self.names = self._load_names(names)
+        self.x = self._load_coordinates(x)
+        self.y = self._load_coordinates(y)
+        self.z = self._load_coordinates(z)
+        self._index = None
+
+    def __repr__(self) -> str:
+        return f"PointSet({len(self)} points)"
+
+    def __len__(self) -> int:
+        return self.names.size
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self.index
+
+    def __getitem__(self, key: Any) -> Point:
+        return self.point(self.index[key])
+
+    def __iter__(self) -> Iterator[Point]:
+        for row in range(len(self)):
+            yield self.point(row)
+
+    def __getstate__(self):
+        return self.names, self.x, self.y, self.z
+
+    def __setstate__(self, state):
+        self.names, self.x, self.y, self.z = state
+        self._index = None
+
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            self._index = self._build_index(self.names)
+
+        return self._index
+
+    @property
+    def is_unique(self) -> bool:
+        return len(self.index) == len(self)
+
+    @staticmethod
+    def _load_names(names: Any) -> np.ndarray:
+        if isinstance(names, (pd.Series, pd.Index)):
+            return names.to_numpy(dtype=object)
+        return np.array(list(names), dtype=object)
+
+    @staticmethod
+    def _load_coordinates(values: Any) -> np.ndarray:
+        if isinstance(values, (pd.Series, pd.Index)):
+            return values.to_numpy(dtype=float)
+        return np.array(values, dtype=float)
+
+    @staticmethod
+    def _build_index(names: np.ndarray) -> dict:
+        # reversed, so that the first row of a repeated name wins
+        return dict(zip(names[::-1].tolist(), range(names.size - 1, -1, -1)))
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame):
+        if data.index.name == 'station':
+            data = data.reset_index()
+
+        return cls(data['station'], data['X'], data['Y'], data['Z'])
+
+    @classmethod
+    def concat(cls, pointsets: Iterator):
+        _sets = list(pointsets)
+
+        if not _sets:
+            return cls()
+
+        return cls(np.concatenate([i.names for i in _sets]),
+                   np.concatenate([i.x for i in _sets]),
+                   np.concatenate([i.y for i in _sets]),
+                   np.concatenate([i.z for i in _sets]))
+
+    @classmethod
+    def merge(cls,
+              pointsets: Iterator,
+              duplicates: str = 'first',
+              tolerance: float = 0.001,
+              radius: float = None,
+              rank: Any = None) -> Tuple[Any, List[Any]]:
+        """
+        Merges any number of point sets in one pass.
+
+        :param pointsets: Iterator
+            Point sets to merge, earlier sets come first.
+        :param duplicates: str
+            Policy for names found in more than one row:
+            'first' keeps the first row, 'last' keeps the last row,
+            'average' keeps the mean coordinates, 'best' keeps the row
+            with the lowest 'rank' and 'raise' raises a ValueError if any
+            of them has conflicting coordinates.
+        :param tolerance: float
+            Largest coordinate spread (per axis) of a repeated name that is
+            not reported as a conflict.
+        :param radius: float
+            Also merge points with different names within 'radius' of each
+            other (see cluster_points), under the name of the row kept (the
+            first one for 'average'). They are reported as conflicts.
+        :param rank: Any
+            Quality of every row of the merged sets, lower is better (e.g.
+            distance from the setup), for the 'best' policy.
+        :return: Tuple[PointSet, List]
+            Merged point set (in order of first appearance) and the names
+            with conflicting coordinates.
+        """
+
+        if duplicates not in DUPLICATE_POLICIES:
+            raise ValueError(f"Unknown duplicates policy: {duplicates}. "
+                             f"Choose from {DUPLICATE_POLICIES}")
+
+        _all = cls.concat(pointsets)
+
+        codes, uniques = pd.factorize(pd.Index(_all.names, dtype=object))
+        if radius is not None:
+            _names = codes
+            codes = cluster_points(_all.x, _all.y, radius, groups=codes)
+            uniques = _all.names[np.unique(codes, return_index=True)[1]]
+
+        if uniques.size == len(_all):
+            return _all, []
+
+        counts = np.bincount(codes)
+        order = np.argsort(codes, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        conflicted = np.zeros(uniques.size, dtype=bool)
+        for values in (_all.x, _all.y, _all.z):
+            _sorted = values[order]
+            spread = np.maximum.reduceat(_sorted, starts) - \
+                np.minimum.reduceat(_sorted, starts)
+            conflicted |= spread > tolerance
+
+        if radius is not None:
+            # more than one name in the cluster
+            _sorted = _names[order]
+            conflicted |= np.maximum.reduceat(_sorted, starts) != \
+                np.minimum.reduceat(_sorted, starts)
+
+        conflicts = pd.unique(_all.names[conflicted[codes]]).tolist()
+
+        if duplicates == 'raise' and conflicts:
+            raise ValueError(f"Conflicting coordinates for {len(conflicts)} "
+                             f"points: {conflicts}")
+        elif duplicates == 'average':
+            _merged = cls(uniques,
+                          np.bincount(codes, weights=_all.x) / counts,
+                          np.bincount(codes, weights=_all.y) / counts,
+                          np.bincount(codes, weights=_all.z) / counts)
+        elif duplicates == 'best':
+            if rank is None:
+                raise ValueError("The 'best' policy needs the rank of every "
+                                 "point")
+            _rank = np.asarray(rank, dtype=float)
+            # lowest rank first within each cluster, ties in row order
+            _best = np.lexsort((np.arange(len(_all)), _rank, codes))
+            _merged = _all.take(_best[starts])
+        elif duplicates == 'last':
+            _merged = _all.take(order[starts + counts - 1])
+        else:
+            _merged = _all.take(order[starts])
+
+        return _merged, conflicts
+
+    def point(self, row: int) -> Point:
+        return Point(self.names[row], self.x[row], self.y[row], self.z[row])
+
+    def row(self, name: Any) -> int:
+        return self.index[name]
+
+    def take(self, rows: Any):
+        return PointSet(self.names[rows],
+                        self.x[rows],
+                        self.y[rows],
+                        self.z[rows])
+
+    def sort(self):
+        return self.take(np.argsort(self.names, kind='stable'))
+
+    def set(self, point: Point):
+        if point.name in self.index:
+            row = self.index[point.name]
+            self.x[row] = point.x
+            self.y[row] = point.y
+            self.z[row] = point.z
+        else:
+            self._index[point.name] = len(self)
+            self.names = np.append(self.names, np.array([point.name],
+                                                        dtype=object))
+            self.x = np.append(self.x, point.x)
+            self.y = np.append(self.y, point.y)
+            self.z = np.append(self.z, point.z)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(np.column_stack([self.x, self.y, self.z]),
+                            index=pd.Index(self.names, name='station'),
+                            columns=['X', 'Y', 'Z'])
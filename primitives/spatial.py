@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from typing import Any, List, Tuple
+
+_SPAN = 2 ** 31
+_POINTS_PER_CELL = 4
+
+
+class GridIndex:
+    """
+    Uniform grid hash over point coordinates.
+
+    Each point is keyed by its cell (ix * 2**31 + iy) and the keys are kept
+    sorted, so the cells of one grid column form a contiguous key range and
+    a rectangular query costs one searchsorted per column.
+    """
+    __slots__ = ['cell', 'x0', 'y0', 'x', 'y', 'keys', 'rows']
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, cell: float = None):
+        _x = np.asarray(x, dtype=float)
+        _y = np.asarray(y, dtype=float)
+        _valid = np.isfinite(_x) & np.isfinite(_y)
+
+        if _valid.any():
+            self.x0 = float(_x[_valid].min())
+            self.y0 = float(_y[_valid].min())
+            _area = (float(_x[_valid].max()) - self.x0) * \
+                    (float(_y[_valid].max()) - self.y0)
+        else:
+            self.x0 = self.y0 = 0.0
+            _area = 0.0
+
+        if cell is None:
+            cell = np.sqrt(_area / max(_valid.sum(), 1) * _POINTS_PER_CELL)
+
+        self.cell = float(cell) if cell > 0 else 1.0
+        self.x = _x.copy()
+        self.y = _y.copy()
+
+        _rows = np.flatnonzero(_valid)
+        _keys = self._key(_x[_rows], _y[_rows])
+        _order = np.argsort(_keys, kind='stable')
+
+        self.keys = _keys[_order]
+        self.rows = _rows[_order]
+
+    def __len__(self) -> int:
+        return self.rows.size
+
+    def _cell(self, x: Any, y: Any) -> Tuple[Any, Any]:
+        return (np.floor((x - self.x0) / self.cell).astype(np.int64),
+                np.floor((y - self.y0) / self.cell).astype(np.int64))
+
+    def _key(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        ix, iy = self._cell(x, y)
+        return ix * _SPAN + iy
+
+    def insert(self, x: np.ndarray, y: np.ndarray, rows: np.ndarray):
+        """
+        Adds points without re-keying the ones already indexed.
+
+        :param x: np.ndarray
+            X of the new points.
+        :param y: np.ndarray
+            Y of the new points.
+        :param rows: np.ndarray
+            Row numbers of the new points in the indexed point set.
+        """
+
+        _x = np.asarray(x, dtype=float)
+        _y = np.asarray(y, dtype=float)
+        _rows = np.asarray(rows, dtype=np.int64)
+
+        _size = max(self.x.size, int(_rows.max(initial=-1)) + 1)
+        if _size > self.x.size:
+            self.x = np.concatenate((self.x,
+                                     np.full(_size - self.x.size, np.nan)))
+            self.y = np.concatenate((self.y,
+                                     np.full(_size - self.y.size, np.nan)))
+        self.x[_rows] = _x
+        self.y[_rows] = _y
+
+        _valid = np.isfinite(_x) & np.isfinite(_y)
+        _keys = self._key(_x[_valid], _y[_valid])
+        _order = np.argsort(_keys, kind='stable')
+        _keys = _keys[_order]
+
+        _at = np.searchsorted(self.keys, _keys, side='right')
+        self.keys = np.insert(self.keys, _at, _keys)
+        self.rows = np.insert(self.rows, _at, _rows[_valid][_order])
+
+    def _candidates(self, xmin: float, ymin: float,
+                    xmax: float, ymax: float) -> np.ndarray:
+        if not self.keys.size:
+            return np.empty(0, dtype=np.int64)
+
+        (ix1, ix2), (iy1, iy2) = self._cell(np.array([xmin, xmax]),
+                                            np.array([ymin, ymax]))
+        # keep the column range to the indexed extent
+        ix1 = max(ix1, self.keys[0] // _SPAN - 1)
+        ix2 = min(ix2, self.keys[-1] // _SPAN + 1)
+        iy1 = max(iy1, -_SPAN // 2)
+        iy2 = min(iy2, _SPAN // 2)
+        _columns = np.arange(ix1, ix2 + 1, dtype=np.int64) * _SPAN
+
+        _lo = np.searchsorted(self.keys, _columns + iy1, side='left')
+        _hi = np.searchsorted(self.keys, _columns + iy2, side='right')
+        _counts = _hi - _lo
+
+        if not _counts.sum():
+            return np.empty(0, dtype=np.int64)
+
+        _starts = np.repeat(_lo - np.cumsum(_counts) + _counts, _counts)
+        return self.rows[_starts + np.arange(_counts.sum())]
+
+    def in_bbox(self, xmin: float, ymin: float,
+                xmax: float, ymax: float) -> np.ndarray:
+        """
+        Rows of the points inside the box (edges included).
+        """
+
+        _rows = self._candidates(xmin, ymin, xmax, ymax)
+        _x, _y = self.x[_rows], self.y[_rows]
+
+        return _rows[(_x >= xmin) & (_x <= xmax) &
+                     (_y >= ymin) & (_y <= ymax)]
+
+    def within(self, x: float, y: float, r: float) -> Tuple[np.ndarray,
+                                                            np.ndarray]:
+        """
+        Rows and distances of the points within r of (x, y), nearest first.
+        """
+
+        _rows = self._candidates(x - r, y - r, x + r, y + r)
+        _dist = np.hypot(self.x[_rows] - x, self.y[_rows] - y)
+        _inside = _dist <= r
+        _rows, _dist = _rows[_inside], _dist[_inside]
+        _order = np.argsort(_dist, kind='stable')
+
+        return _rows[_order], _dist[_order]
+
+    def nearest(self, x: float, y: float, k: int = 1) -> Tuple[np.ndarray,
+                                                               np.ndarray]:
+        """
+        Rows and distances of the k points nearest to (x, y), nearest first.
+        """
+
+        k = min(k, len(self))
+        if k < 1 or not (np.isfinite(x) and np.isfinite(y)):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        _radius = self.cell
+        while True:
+            _rows = self._candidates(x - _radius, y - _radius,
+                                     x + _radius, y + _radius)
+            if _rows.size >= k:
+                _dist = np.hypot(self.x[_rows] - x, self.y[_rows] - y)
+                _kth = np.partition(_dist, k - 1)[k - 1]
+                # the square holds every point closer than its half-side
+                if _kth <= _radius:
+                    _order = np.argsort(_dist, kind='stable')[:k]
+                    return _rows[_order], _dist[_order]
+                _radius = _kth
+            else:
+                _radius *= 2
+
+
+def _first_appearance(labels: np.ndarray) -> np.ndarray:
+    # labels numbered 0, 1, ... in order of first appearance
+    _, _first, _inverse = np.unique(labels, return_index=True,
+                                    return_inverse=True)
+    _rank = np.empty(_first.size, dtype=np.int64)
+    _rank[np.argsort(_first, kind='stable')] = np.arange(_first.size)
+
+    return _rank[_inverse.reshape(-1)]
+
+
+# cell offsets compared with each cell, the other half of the neighbourhood
+# is covered from the other side
+_NEIGHBOURS = ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+def _close_pairs(x: np.ndarray,
+                 y: np.ndarray,
+                 rows: np.ndarray,
+                 radius: float) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+    # pairs of 'rows' within 'radius' of each other, from a grid hash
+    first, second = [], []
+
+    _px, _py = x[rows], y[rows]
+    ix = np.floor((_px - _px.min()) / radius).astype(np.int64)
+    iy = np.floor((_py - _py.min()) / radius).astype(np.int64) + 1
+    _keys = ix * _SPAN + iy
+    _order = np.argsort(_keys, kind='stable')
+    _keys = _keys[_order]
+    _sorted = rows[_order]
+    _m = _keys.size
+
+    for dx, dy in _NEIGHBOURS:
+        _lo = np.searchsorted(_keys, _keys + dx * _SPAN + dy, side='left')
+        _hi = np.searchsorted(_keys, _keys + dx * _SPAN + dy, side='right')
+        if (dx, dy) == (0, 0):
+            # each pair of the same cell once
+            _lo = np.maximum(_lo, np.arange(1, _m + 1))
+        _counts = np.maximum(_hi - _lo, 0)
+        _total = int(_counts.sum())
+        if not _total:
+            continue
+
+        _a = np.repeat(np.arange(_m), _counts)
+        _b = np.repeat(_lo - np.cumsum(_counts) + _counts, _counts) + \
+            np.arange(_total)
+        _a, _b = _sorted[_a], _sorted[_b]
+        _close = np.hypot(x[_a] - x[_b], y[_a] - y[_b]) <= radius
+        first.append(_a[_close])
+        second.append(_b[_close])
+
+    return first, second
+
+
+def cluster_points(x: np.ndarray,
+                   y: np.ndarray,
+                   radius: float,
+                   groups: np.ndarray = None) -> np.ndarray:
+    """
+    Single-linkage clusters of the points within 'radius' of each other.
+
+    Points are hashed to cells of side 'radius', so a point is only
+    compared with the points of its own and the neighbouring cells:
+    linear in the number of points unless they pile up in a few cells.
+    A chain of close points forms one cluster, even if its ends are
+    further apart than 'radius'.
+
+    :param x: np.ndarray
+        X of the points.
+    :param y: np.ndarray
+        Y of the points.
+    :param radius: float
+        Largest horizontal distance between neighbours of a cluster.
+    :param groups: np.ndarray
+        Integer codes of points that belong together anyway (e.g. the
+        same name), whatever their distance.
+    :return: np.ndarray
+        Cluster of every point, numbered in order of first appearance.
+        Points without coordinates are only clustered by 'groups'.
+    """
+
+    _x = np.asarray(x, dtype=float)
+    _y = np.asarray(y, dtype=float)
+    _n = _x.size
+
+    labels = np.arange(_n)
+    first, second = [], []
+
+    # each point of a group is linked to the first point of the group
+    if groups is not None:
+        _groups = np.asarray(groups)
+        _first = np.full(int(_groups.max(initial=-1)) + 1, _n)
+        np.minimum.at(_first, _groups, np.arange(_n))
+        _members = np.flatnonzero(_first[_groups] != np.arange(_n))
+        first.append(_first[_groups[_members]])
+        second.append(_members)
+
+    _rows = np.flatnonzero(np.isfinite(_x) & np.isfinite(_y))
+    if _rows.size >= 2 and radius > 0:
+        _first_pairs, _second_pairs = _close_pairs(_x, _y, _rows, radius)
+        first.extend(_first_pairs)
+        second.extend(_second_pairs)
+
+    if first:
+        _a = np.concatenate(first)
+        _b = np.concatenate(second)
+
+        # min-label propagation with pointer jumping, until every pair
+        # shares a label
+        while True:
+            _low = np.minimum(labels[_a], labels[_b])
+            _labels = labels.copy()
+            np.minimum.at(_labels, _a, _low)
+            np.minimum.at(_labels, _b, _low)
+            _labels = np.minimum(_labels, _labels[labels])
+            while True:
+                _jumped = _labels[_labels]
+                if np.array_equal(_jumped, _labels):
+                    break
+                _labels = _jumped
+            if np.array_equal(_labels, labels):
+                break
+            labels = _labels
+
+    return _first_appearance(labels)
+
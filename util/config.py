@@ -22,6 +22,11 @@ ATT_PROJECT_FILES = ".ATTFiles"
 ATT_PROJECT_EXT = ".attp"
 ATT_FILE_EXT = ".attf"
 ATT_FILE_MAP_EXT = ".attm"
+ATT_CACHE_EXT = ".attc"
+ATT_CACHE_SIZE = 256 * 1024 ** 2
+ATT_CHUNK_EXT = ".attk"
+ATT_STREAM_MEMORY = 64 * 1024 ** 2
+ATT_VERSION = "0.1.0"
 XLS_EXTS = [".xls", ".xlsx"]
 
 
@@ -2,7 +2,7 @@
 import pandas as pd
 import pickle
 from pathlib import Path
-from typing import Union, Any
+from typing import Union, Any, Iterator
 from atsurvey.util.config import *
 
 
@@ -29,6 +29,100 @@ def load_data(data: Union[str, Path, pd.DataFrame],
         raise TypeError(f"Can't load data: {data}")
 
 
+def iter_data(data: Union[str, Path, pd.DataFrame],
+              chunk_size: int,
+              **kwargs: Any) -> Iterator[pd.DataFrame]:
+    """
+    Reads data in chunks of at most 'chunk_size' rows.
+
+    CSV and chunk files (ATT_CHUNK_EXT) are read chunk by chunk, so only
+    one chunk is in memory at a time. Anything else is loaded whole with
+    load_data and then sliced.
+
+    :param data: Union[str, Path, pd.DataFrame]
+        Data to read, anything load_data accepts.
+    :param chunk_size: int
+        Maximum rows per chunk.
+    :param kwargs: Any
+        Passed to the reader (e.g. pd.read_csv).
+    :return: Iterator[pd.DataFrame]
+        Chunks, with the row index of the whole data.
+    """
+
+    if isinstance(data, (str, Path)):
+        _file = Path(data)
+        _ext = _file.suffix
+
+        if _ext == ".csv":
+            with pd.read_csv(_file, chunksize=chunk_size, **kwargs) as reader:
+                yield from reader
+            return
+        elif _ext == ATT_CHUNK_EXT:
+            with open(_file, 'rb') as chunk_file:
+                while True:
+                    try:
+                        _data = pickle.load(chunk_file)
+                    except EOFError:
+                        return
+                    for i in range(0, len(_data), chunk_size):
+                        yield _data.iloc[i:i + chunk_size]
+
+    _data = load_data(data, **kwargs)
+    for i in range(0, len(_data), chunk_size):
+        yield _data.iloc[i:i + chunk_size]
+
+
+class ChunkWriter:
+    """
+    Appends chunks of points to one file as they are computed.
+
+    '.csv' files get the X, Y, Z columns (and the point names, column
+    'names', as first column if 'point_id'), in the layout of
+    Container.to_csv. Chunk files
+    (ATT_CHUNK_EXT) get every chunk pickled in full, one after the other,
+    and can be read back with iter_data. Use as a context manager.
+    """
+
+    def __init__(self,
+                 dst: Union[str, Path],
+                 names: str = 'station',
+                 decimals: int = 4,
+                 point_id: bool = False):
+        self.path = Path(dst)
+        self.names = names
+        self.decimals = decimals
+        self.point_id = point_id
+        self.rows = 0
+        self._file = None
+
+        if self.path.suffix not in (".csv", ATT_CHUNK_EXT):
+            raise TypeError(f"Can't write chunks to file type: "
+                            f"{self.path.suffix}")
+
+    def __enter__(self):
+        mode = 'w' if self.path.suffix == ".csv" else 'wb'
+        self._file = open(self.path, mode, newline='' if mode == 'w' else None)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, chunk: pd.DataFrame):
+        if self.path.suffix == ".csv":
+            _points = chunk[['X', 'Y', 'Z']].round(self.decimals)
+            _points.index = chunk[self.names].values
+            _points.to_csv(self._file, header=False, index=self.point_id)
+        else:
+            pickle.dump(chunk, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self.rows += len(chunk)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
 def export_shp(data: pd.DataFrame,
                dst: Union[str, Path],
                name: str,
@@ -9,120 +9,309 @@ def round8(number: float):
     return round(number, 8)
 
 
-def vectorize(func):
-    def wrapper(*args, **kwargs):
-        vector = False
+def calc_k(x1: Any, x2: Any, exact: bool = True):
+    """
+    :param exact: bool
+        Round like the builtin round, False rounds arrays with np.round.
+    """
 
-        for i in args:
-            if isinstance(i, (np.ndarray, pd.Series)):
-                vector = True
-                break
+    x_sum = x1 + x2
+    _ = (12311 * ((((x_sum / 2) * (10 ** -6)) - 0.5) ** 2) - 400) * (10 ** -6)
+    if exact:
+        return round_exact(1 + _, DIST_ROUND)
+    return round_fast(1 + _, DIST_ROUND)
 
-        if not vector:
-            for i in kwargs:
-                if isinstance(kwargs[i], (np.ndarray, pd.Series)):
-                    vector = True
-                    break
 
-        if vector:
-            vfunc = np.vectorize(func)
-        else:
-            vfunc = func
+def is_vector(*args: Any, **kwargs: Any) -> bool:
+    for i in args:
+        if isinstance(i, (np.ndarray, pd.Series)):
+            return True
 
-        result = vfunc(*args, **kwargs)
+    for i in kwargs:
+        if isinstance(kwargs[i], (np.ndarray, pd.Series)):
+            return True
 
-        return result
+    return False
 
-    return wrapper
 
+def as_array(values: Any) -> Any:
+    """
+    Converts array-likes to float arrays and leaves scalars untouched.
 
-def calc_k(x1: float, x2: float):
-    x_sum = x1 + x2
-    _ = (12311 * ((((x_sum / 2) * (10 ** -6)) - 0.5) ** 2) - 400) * (10 ** -6)
-    return round(1 + _, DIST_ROUND)
+    :param values: Any
+        Scalar, numpy array or pandas Series. Object arrays of primitives
+        (anything exposing 'value') are unpacked element-wise.
+    :return: Any
+        numpy float array for array-likes, the input itself for scalars.
+    """
+
+    if isinstance(values, pd.Series):
+        values = values.values
+
+    if isinstance(values, np.ndarray):
+        if values.dtype == object:
+            return np.array([getattr(i, "value", i) for i in values],
+                            dtype=float)
+        return values.astype(float, copy=False)
+
+    return values
+
+
+def round_exact(values: Any, decimals: int, out: np.ndarray = None) -> Any:
+    """
+    Rounds like the builtin round, for scalars and arrays alike.
+
+    np.round scales, rounds and unscales, which can land on the other side
+    of a tie than the correctly rounded builtin. Only those near-tie elements
+    are re-rounded with the builtin, everything else stays vectorized.
+
+    :param values: Any
+        Scalar or numpy array.
+    :param decimals: int
+        Number of decimals.
+    :param out: np.ndarray
+        Optional array to write the result to (may be 'values' itself).
+    :return: Any
+        Rounded scalar or array.
+    """
+
+    if not isinstance(values, np.ndarray):
+        return round(values, decimals)
+
+    scaled = values * 10.0 ** decimals
+
+    with np.errstate(invalid='ignore'):
+        ties = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) <= np.abs(
+            2 * np.spacing(scaled))
+
+    _ties = values[ties].tolist() if ties.any() else []
+
+    rounded = np.round(values, decimals, out=out)
+
+    if _ties:
+        rounded[ties] = [round(i, decimals) for i in _ties]
+
+    return rounded
+
+
+def round_fast(values: Any, decimals: int, out: np.ndarray = None) -> Any:
+    if isinstance(values, np.ndarray):
+        return np.round(values, decimals, out=out)
+    return round(values, decimals)
 
 
-@vectorize
 def grad2rad(angle: Any):
-    return round((angle * np.pi) / 200, ANGLE_ROUND)
+    angle = as_array(angle)
+    return round_exact((angle * np.pi) / 200, ANGLE_ROUND)
 
 
-@vectorize
 def rad2grad(angle: Any):
-    return round((angle * 200) / np.pi, ANGLE_ROUND)
+    angle = as_array(angle)
+    return round_exact((angle * 200) / np.pi, ANGLE_ROUND)
 
 
-@vectorize
 def slope2hor(distance: Any, angle: Any):
-    return round(distance * np.sin(grad2rad(angle)), DIST_ROUND)
+    distance, angle = as_array(distance), as_array(angle)
+    return round_fast(distance * np.sin(grad2rad(angle)), DIST_ROUND)
 
 
-@vectorize
 def hor2ref(distance: Any, mean_elevation: Any):
-    return round(distance * (EARTH_C / (EARTH_C + mean_elevation)), DIST_ROUND)
+    distance, mean_elevation = as_array(distance), as_array(mean_elevation)
+    # numpy scalars promote the product and round like np.round
+    _round = round_fast if isinstance(mean_elevation, np.generic) \
+        else round_exact
+    return _round(distance * (EARTH_C / (EARTH_C + mean_elevation)),
+                  DIST_ROUND)
 
 
-@vectorize
 def ref2egsa(distance: Any, k: float = 0.9996):
-    return round(distance * k, DIST_ROUND)
+    distance, k = as_array(distance), as_array(k)
+    _round = round_fast if isinstance(k, np.generic) else round_exact
+    return _round(distance * k, DIST_ROUND)
 
 
-@vectorize
 def p2p_dh(distance: Any, angle: Any, uo: Any, us: Any):
-    return round(distance * np.cos(grad2rad(angle)) + uo - us, DIST_ROUND)
+    distance, angle = as_array(distance), as_array(angle)
+    uo, us = as_array(uo), as_array(us)
+    return round_fast(distance * np.cos(grad2rad(angle)) + uo - us,
+                      DIST_ROUND)
 
 
-@vectorize
 def mean_dh_signed(original: Any, mean: Any):
+    if is_vector(original, mean):
+        original, mean = as_array(original), as_array(mean)
+        return np.where(original > 0, mean, 0 - mean)
+
     if original > 0:
         return mean
     else:
         return 0 - mean
 
 
-@vectorize
 def calc_X(init_x: Any, distance: Any, azimuth: Any):
-    return round(init_x + distance * np.sin(grad2rad(azimuth)), CORDS_ROUND)
+    init_x, distance = as_array(init_x), as_array(distance)
+    azimuth = as_array(azimuth)
+    return round_fast(init_x + distance * np.sin(grad2rad(azimuth)),
+                      CORDS_ROUND)
 
 
-@vectorize
 def calc_Y(init_y: Any, distance: Any, azimuth: Any):
-    return round(init_y + distance * np.cos(grad2rad(azimuth)), CORDS_ROUND)
+    init_y, distance = as_array(init_y), as_array(distance)
+    azimuth = as_array(azimuth)
+    return round_fast(init_y + distance * np.cos(grad2rad(azimuth)),
+                      CORDS_ROUND)
 
 
-@vectorize
 def calc_Z(init_z: Any, distance: Any, angle: Any, uo: Any, us: Any):
-    return round(init_z + p2p_dh(distance, angle, uo, us), CORDS_ROUND)
+    init_z = as_array(init_z)
+    return round_fast(init_z + p2p_dh(distance, angle, uo, us), CORDS_ROUND)
+
+
+def _resolve_grads(angle: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid='ignore'):
+        return np.where((angle >= 0) & (angle <= 400),
+                        angle,
+                        np.where(angle > 400,
+                                 angle % 400,
+                                 angle + np.abs(angle // 400) * 400))
 
 
-@vectorize
 def resolve_angle(angle: Any):
+    if is_vector(angle):
+        return round_exact(_resolve_grads(as_array(angle)), ANGLE_ROUND)
+
     if hasattr(angle, "value"):
         _angle = angle.value
     else:
         _angle = angle
 
-    if 0 <= _angle <= 400:
-        return round(_angle, ANGLE_ROUND)
-    elif _angle > 400:
-        return round(_angle % 400, ANGLE_ROUND)
+    return resolve_grad(_angle)
+
+
+def resolve_angle_fast(angle: Any) -> Any:
+    """
+    resolve_grad applied to arrays: numpy scalars round like np.round, so
+    this gives, element by element, what resolve_grad gives on them.
+    """
+
+    return np.round(_resolve_grads(as_array(angle)), ANGLE_ROUND)
+
+
+def resolve_grad(angle: float) -> float:
+    """
+    Scalar-only resolve_angle, without the array dispatch.
+    """
+
+    if 0 <= angle <= 400:
+        return round(angle, ANGLE_ROUND)
+    elif angle > 400:
+        return round(angle % 400, ANGLE_ROUND)
     else:
-        return round(_angle + abs(_angle // 400) * 400, ANGLE_ROUND)
+        return round(angle + abs(angle // 400) * 400, ANGLE_ROUND)
 
 
-@vectorize
 def determine_quartile(dx: Any, dy: Any):
-    delta = round(np.arctan(abs(dx) / abs(dy)), ANGLE_ROUND)
-    delta_grad = rad2grad(delta)
-
-    if dx > 0 and dy > 0:
-        return delta_grad
-    elif dx > 0 and dy < 0:
-        return 200 - delta_grad
-    elif dx < 0 and dy < 0:
-        return 200 + delta_grad
-    elif dx < 0 and dy > 0:
-        return 400 - delta_grad
+    """
+    Grid azimuth in grads of the direction (dx, dy).
+
+    Quadrants are resolved from the signs of dx and dy instead of branching,
+    so axis-aligned directions are covered as well (dx=0 -> 0/200,
+    dy=0 -> exactly 100/300). Coincident points (dx=dy=0) have no azimuth and
+    give NaN.
+
+    :param dx: Any
+        Scalar or array of X differences (to - from).
+    :param dy: Any
+        Scalar or array of Y differences (to - from).
+    :return: Any
+        Azimuth(s) in grads.
+    """
+
+    if is_vector(dx, dy):
+        dx, dy = as_array(dx), as_array(dy)
+
+        delta = np.round(np.arctan2(np.abs(dx), np.abs(dy)), ANGLE_ROUND)
+        delta_grad = np.where(dy == 0, 100,
+                              np.round((delta * 200) / np.pi, ANGLE_ROUND))
+
+        base = np.where(dy < 0, 200, np.where(dx < 0, 400, 0))
+        sign = np.where((dx < 0) ^ (dy < 0), -1, 1)
+
+        return np.where((dx == 0) & (dy == 0),
+                        np.nan,
+                        base + sign * delta_grad)
+
+    if dx == 0 and dy == 0:
+        return np.nan
+
+    if dy == 0:
+        delta_grad = 100.0
+    else:
+        delta = round(np.arctan2(abs(dx), abs(dy)), ANGLE_ROUND)
+        delta_grad = rad2grad(delta)
+
+    base = 200 if dy < 0 else 400 if dx < 0 else 0
+    sign = -1 if (dx < 0) != (dy < 0) else 1
+
+    return base + sign * delta_grad
+
+
+def propagate_azimuths(a_start: Any, angles: Any, offsets: Any = None):
+    """
+    Traverse azimuths a[i] = a[i-1] + angle[i] + 200 (mod 400) as one
+    cumulative sum.
+
+    Angles carry ANGLE_ROUND decimals, so the sum is done on int64 multiples
+    of 10**-ANGLE_ROUND. That is exact and gives the same values as rounding
+    after every step, with no drift on long traverses.
+
+    Many traverses are handled in one call by passing the angles of all of
+    them back to back in 'angles' together with their 'offsets'.
+
+    :param a_start: Any
+        Starting azimuth, or one starting azimuth per traverse.
+    :param angles: Any
+        Horizontal angles (flat array for several traverses).
+    :param offsets: Any
+        Segment boundaries of the traverses in 'angles', n_traverses + 1
+        values starting with 0 and ending with len(angles). None means a
+        single traverse.
+    :return: np.ndarray
+        Azimuths in grads, aligned with 'angles'. A NaN angle turns the
+        rest of its traverse to NaN.
+    """
+
+    _angles = np.atleast_1d(as_array(val2array(angles)))
+    _starts = np.atleast_1d(as_array(val2array(a_start)))
+
+    if offsets is None:
+        _offsets = np.array([0, _angles.size])
+    else:
+        _offsets = np.asarray(offsets, dtype=np.int64)
+
+    _lengths = np.diff(_offsets)
+    _unit = 10 ** ANGLE_ROUND
+    _full = 400 * _unit
+
+    _missing = np.isnan(_angles)
+    _steps = np.rint(np.where(_missing, 0, _angles) * _unit).astype(np.int64)
+    _steps = (_steps + 200 * _unit) % _full
+    _start_units = np.rint(_starts * _unit).astype(np.int64) % _full
+
+    _total = np.cumsum(_steps)
+    _before = np.concatenate(([0], _total))[_offsets[:-1]]
+    _total = _total - np.repeat(_before, _lengths)
+
+    _azimuths = (np.repeat(_start_units, _lengths) + _total) % _full
+    _azimuths = _azimuths / _unit
+
+    if _missing.any():
+        _nans = np.cumsum(_missing)
+        _nans_before = np.concatenate(([0], _nans))[_offsets[:-1]]
+        _nans = _nans - np.repeat(_nans_before, _lengths)
+        _azimuths[_nans > 0] = np.nan
+
+    return _azimuths
 
 
 def val2array(values: Any) -> np.ndarray: